@@ -0,0 +1,263 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import List
+
+from app.download_manager import configure_download_manager
+from app.downloader_thread import download_blocking
+from app.plugins import PluginError, PluginInstaller, load_plugin_manifest
+from main import FileUtils, JavaUtils, get_resource_path
+from app.repair import repair_install, verify_install
+from utils.bundle_utils import BundleError, BundleWriter, OfflineBundle
+from utils.cache_server import DEFAULT_PORT, CacheServer, resolve_mirrors
+from utils.release_catalog import CatalogError, ReleaseCatalog
+from utils.retry_policy import RetryPolicy
+
+PLATFORM_KEYS = ("windows", "linux-x64", "linux-aarch64")
+
+
+def load_config() -> dict:
+	with open(get_resource_path("installer_config.json"), "r", encoding="utf-8") as f:
+		return json.load(f)
+
+
+def print_api_retry(msg: dict):
+	print(f"  GitHub API: {msg['reason']}, повтор через {msg['wait']} с (попытка {msg['attempt']})", flush=True)
+
+
+def cmd_bundle(args) -> int:
+	config = load_config()
+	versions = args.java or sorted(set(config["java_urls"]["windows"]) | set(config["java_urls"]["linux"]))
+	platforms = args.platform or [JavaUtils.get_platform_key()]
+	if None in platforms:
+		print("Текущая платформа не поддерживается, укажите --platform явно.")
+		return 1
+
+	download_dir = FileUtils.get_download_dir()
+	writer = BundleWriter(args.output, key=args.key)
+	mirrors = resolve_mirrors(config, args.mirror)
+
+	core_version = args.core_version or config.get("core_version", "latest")
+	catalog = ReleaseCatalog.from_config(config, FileUtils.get_app_dir(), on_retry=print_api_retry)
+	try:
+		catalog.update()
+		download_info = catalog.resolve(core_version)
+	except CatalogError as e:
+		print(e)
+		return 1
+	if not download_info:
+		print(f"Не удалось найти ядро версии '{core_version}' на GitHub.")
+		return 1
+
+	print(f"Ядро {download_info['version']} ({download_info['asset_name']})")
+	core_path = os.path.join(download_dir, download_info["asset_name"])
+	try:
+		download_blocking(download_info["download_url"], core_path, download_info["sha256"], mirrors=mirrors)
+	except RuntimeError as e:
+		print(f"Не удалось скачать ядро: {e}")
+		return 1
+	writer.add_core(core_path, download_info)
+
+	for platform_key in platforms:
+		for version in versions:
+			url = JavaUtils.get_java_url(config["java_urls"], platform_key, version)
+			if not url:
+				print(f"URL для Java {version} ({platform_key}) не найден в конфигурации, пропускаем.")
+				continue
+			print(f"Java {version} ({platform_key})")
+			try:
+				java_path = download_blocking(url, os.path.join(download_dir, os.path.basename(url)), mirrors=mirrors)
+			except RuntimeError as e:
+				print(f"Не удалось скачать Java {version} ({platform_key}): {e}")
+				return 1
+			writer.add_java(java_path, platform_key, version, url)
+
+	manifest = writer.write()
+	print(f"Бандл создан: {args.output} ({len(manifest['files'])} файлов)")
+	return 0
+
+
+def cmd_releases(args) -> int:
+	config = load_config()
+	catalog = ReleaseCatalog.from_config(config, FileUtils.get_app_dir(), on_retry=print_api_retry)
+	try:
+		if not args.offline:
+			catalog.update()
+		if args.resolve:
+			download_info = catalog.resolve(args.resolve, args.asset_pattern)
+			if not download_info:
+				print(f"Версия '{args.resolve}' не найдена.")
+				return 1
+			print(json.dumps(download_info, ensure_ascii=False, indent=2))
+			return 0
+	except CatalogError as e:
+		print(e)
+		return 1
+
+	for release in catalog.releases[:args.limit]:
+		marker = " (pre-release)" if release["prerelease"] else ""
+		print(f"{release['tag']}{marker}\t{(release['date'] or '')[:10]}\t{len(release['assets'])} файлов")
+	return 0
+
+
+def cmd_verify_bundle(args) -> int:
+	try:
+		bundle = OfflineBundle(args.bundle, key=args.key).open()
+		bundle.verify()
+	except BundleError as e:
+		print(e)
+		return 1
+	print(f"Бандл {args.bundle} цел: {len(bundle.manifest['files'])} файлов проверено.")
+	return 0
+
+
+def cmd_serve_cache(args) -> int:
+	cache_dir = args.dir or FileUtils.get_download_dir()
+	server = CacheServer(cache_dir, host=args.host, port=args.port)
+	print(f"Раздаём {cache_dir} на порту {args.port}. Остановка: Ctrl+C")
+	server.serve_forever()
+	return 0
+
+
+def _default_install_path(config: dict) -> str:
+	platform_key = JavaUtils.get_platform_key() or ""
+	return config["default_install_path"]["windows" if platform_key == "windows" else "linux"]
+
+
+def cmd_verify(args) -> int:
+	return verify_install(args.path or _default_install_path(load_config()), full=args.full, jobs=args.jobs)
+
+
+def cmd_repair(args) -> int:
+	config = load_config()
+	return repair_install(
+		config, args.path or _default_install_path(config), full=args.full, force=args.force,
+		jobs=args.jobs, mirrors=resolve_mirrors(config, args.mirror)
+	)
+
+
+def cmd_plugins(args) -> int:
+	config = load_config()
+	install_path = args.path or _default_install_path(config)
+	installer = PluginInstaller(config, install_path, resolve_mirrors(config, args.mirror), on_retry=print_api_retry)
+	try:
+		entries = installer.locked_entries() if args.locked else load_plugin_manifest(config, args.manifest)
+		if not entries:
+			print("Манифест плагинов пуст.")
+			return 0
+		paths = installer.install(entries, update=args.update)
+	except (PluginError, OSError) as e:
+		print(e)
+		return 1
+	for name, plugin in sorted(installer.lock["plugins"].items()):
+		version = f" {plugin['version']}" if plugin.get("version") else ""
+		print(f"  {name}{version}: {plugin['file_name']}")
+	print(f"Плагинов установлено: {len(paths)}. Lock-файл: {installer.lock_path}")
+	return 0
+
+
+def cmd_gui(args) -> int:
+	from app.installer import InstallerApp
+
+	if args.serve_cache:
+		CacheServer(FileUtils.get_download_dir()).start()
+
+	bundle = None
+	if args.bundle:
+		try:
+			bundle = OfflineBundle(args.bundle, key=args.key).open()
+		except BundleError as e:
+			logging.error(str(e))
+			print(e)
+			return 1
+
+	app = InstallerApp(bundle=bundle, mirrors=args.mirror, core_version=args.core_version)
+	app.mainloop()
+	return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(prog="LumiInstaller")
+	parser.add_argument("--bundle", help="установить из офлайн-бандла без обращения к сети")
+	parser.add_argument("--key", help="ключ подписи бандла (по умолчанию из LUMI_BUNDLE_KEY)")
+	parser.add_argument("--mirror", action="append", help="адрес кэш-сервера в локальной сети (http://host:port)")
+	parser.add_argument("--serve-cache", action="store_true", help="раздавать скачанные файлы другим установщикам")
+	parser.add_argument("--limit-rate", type=int, help="общее ограничение скорости скачивания, КБ/с (0 - без ограничения)")
+	parser.add_argument("--core-version", help="версия ядра: тег, latest, latest-prerelease или диапазон (>=1.2,<2)")
+	parser.set_defaults(func=cmd_gui)
+	subparsers = parser.add_subparsers(dest="command")
+
+	bundle_parser = subparsers.add_parser("bundle", help="собрать офлайн-бандл с ядром и Java")
+	bundle_parser.add_argument("output", help="путь к создаваемому архиву")
+	bundle_parser.add_argument("--java", action="append", help="версия Java (можно указать несколько раз)")
+	bundle_parser.add_argument("--platform", action="append", choices=PLATFORM_KEYS,
+							   help="целевая платформа (по умолчанию текущая)")
+	bundle_parser.add_argument("--key", default=argparse.SUPPRESS, help="ключ подписи бандла")
+	bundle_parser.add_argument("--mirror", action="append", default=argparse.SUPPRESS, help="адрес кэш-сервера")
+	bundle_parser.add_argument("--core-version", default=argparse.SUPPRESS, help="версия ядра")
+	bundle_parser.set_defaults(func=cmd_bundle)
+
+	releases_parser = subparsers.add_parser("releases", help="показать каталог релизов ядра")
+	releases_parser.add_argument("--resolve", help="найти релиз по спецификатору версии")
+	releases_parser.add_argument("--asset-pattern", help="шаблон имени файла ядра (по умолчанию из конфигурации)")
+	releases_parser.add_argument("--offline", action="store_true", help="не обновлять индекс, использовать локальный")
+	releases_parser.add_argument("--limit", type=int, default=20)
+	releases_parser.set_defaults(func=cmd_releases)
+
+	verify_parser = subparsers.add_parser("verify-bundle", help="проверить офлайн-бандл по манифесту")
+	verify_parser.add_argument("bundle", help="путь к архиву")
+	verify_parser.add_argument("--key", default=argparse.SUPPRESS, help="ключ подписи бандла")
+	verify_parser.set_defaults(func=cmd_verify_bundle)
+
+	for name, help_text, func in (
+		("verify", "проверить установленные файлы по манифесту", cmd_verify),
+		("repair", "восстановить повреждённые файлы установки", cmd_repair)
+	):
+		check_parser = subparsers.add_parser(name, help=help_text)
+		check_parser.add_argument("path", nargs="?", help="папка установки (по умолчанию из конфигурации)")
+		check_parser.add_argument("--full", action="store_true", help="пересчитать хэши всех файлов, даже неизменённых")
+		check_parser.add_argument("--jobs", type=int, help="число потоков проверки")
+		if name == "repair":
+			check_parser.add_argument("--force", action="store_true", help="перезаписать вручную изменённые скрипты")
+			check_parser.add_argument("--mirror", action="append", default=argparse.SUPPRESS, help="адрес кэш-сервера")
+		check_parser.set_defaults(func=func)
+
+	plugins_parser = subparsers.add_parser("plugins", help="установить плагины по манифесту в папку plugins/")
+	plugins_parser.add_argument("path", nargs="?", help="папка установки (по умолчанию из конфигурации)")
+	plugins_parser.add_argument("--manifest", help="JSON-файл со списком плагинов (по умолчанию plugins из конфигурации)")
+	plugins_parser.add_argument("--update", action="store_true", help="заново разрешить версии, игнорируя lock-файл")
+	plugins_parser.add_argument("--locked", action="store_true", help="установить ровно то, что записано в lock-файле")
+	plugins_parser.add_argument("--mirror", action="append", default=argparse.SUPPRESS, help="адрес кэш-сервера")
+	plugins_parser.set_defaults(func=cmd_plugins)
+
+	serve_parser = subparsers.add_parser("serve-cache", help="раздавать кэш загрузок по HTTP для других установщиков")
+	serve_parser.add_argument("--dir", help="каталог кэша (по умолчанию ~/.lumi-installer/downloads)")
+	serve_parser.add_argument("--host", default="0.0.0.0")
+	serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+	serve_parser.set_defaults(func=cmd_serve_cache)
+
+	return parser
+
+
+def run_cli(argv: List[str]) -> int:
+	args = build_parser().parse_args(argv)
+
+	try:
+		config = load_config()
+	except (OSError, ValueError):
+		config = {}
+	download_config = config.get("download", {})
+	rate_limit_kbps = args.limit_rate if args.limit_rate is not None else download_config.get("rate_limit_kbps", 0)
+	configure_download_manager(
+		max_concurrent=download_config.get("max_concurrent", 3),
+		rate_limit=rate_limit_kbps * 1024,
+		retry_policy=RetryPolicy.from_config(config)
+	)
+
+	return args.func(args)
+
+
+if __name__ == "__main__":
+	sys.exit(run_cli(sys.argv[1:]))
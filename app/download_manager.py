@@ -0,0 +1,405 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+import aiohttp
+
+from utils.cache_server import DIGEST_HEADER, mirror_url
+from utils.file_utils import FileUtils
+from utils.retry_policy import CircuitBreaker, RetryPolicy, get_circuit_breaker
+
+CHUNK_SIZE = 64 * 1024
+
+
+def format_speed(speed_bytes_per_sec: float) -> str:
+	if speed_bytes_per_sec > 1024 * 1024:
+		return f"{speed_bytes_per_sec / (1024 * 1024):.2f} MB/s"
+	if speed_bytes_per_sec > 1024:
+		return f"{speed_bytes_per_sec / 1024:.2f} KB/s"
+	return f"{speed_bytes_per_sec:.2f} B/s"
+
+
+class TokenBucket:
+	def __init__(self, rate: float, capacity: Optional[float] = None):
+		self.rate = rate
+		self.capacity = capacity or max(rate, CHUNK_SIZE)
+		self._tokens = self.capacity
+		self._last = time.monotonic()
+		self._lock = asyncio.Lock()
+
+	async def consume(self, amount: int):
+		if self.rate <= 0:
+			return
+		async with self._lock:
+			while True:
+				now = time.monotonic()
+				self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+				self._last = now
+				# A request larger than the bucket waits for a full bucket and goes into debt, which the next caller repays.
+				needed = min(amount, self.capacity)
+				if self._tokens >= needed:
+					self._tokens -= amount
+					return
+				await asyncio.sleep((needed - self._tokens) / self.rate)
+
+
+class DownloadHandle:
+	def __init__(self, manager: "DownloadManager", url: str, save_path: str, queue, expected_sha256: Optional[str],
+				 priority: int, max_retries: int, mirrors: List[str]):
+		self.manager = manager
+		self.url = url
+		self.save_path = save_path
+		self.queue = queue
+		self.expected_sha256 = expected_sha256
+		self.priority = priority
+		self.max_retries = max_retries
+		self.mirrors = mirrors
+		self.state = "queued"
+		self.retries = 0
+		self.retry_wait = 0.0
+		self.downloaded = 0
+		self.total = None
+		self._resume_event: Optional[asyncio.Event] = None
+		self._task: Optional[asyncio.Task] = None
+		self._discard = True
+		self._parked = False
+		self._done = threading.Event()
+
+	@property
+	def part_path(self) -> str:
+		return self.save_path + ".part"
+
+	def pause(self):
+		self.manager.call_soon(self._set_paused, True)
+
+	def resume(self):
+		self.manager.call_soon(self._set_paused, False)
+
+	def cancel(self, discard: bool = True):
+		self.manager.call_soon(self._cancel, discard)
+
+	def wait(self, timeout: Optional[float] = None) -> bool:
+		return self._done.wait(timeout)
+
+	def _set_paused(self, paused: bool):
+		if self.state in ("finished", "error", "cancelled"):
+			return
+		if paused:
+			self._resume_event.clear()
+			self.state = "paused"
+		else:
+			self._resume_event.set()
+			self.state = "running" if self._task else "queued"
+			if self._parked:
+				self._parked = False
+				self.manager._enqueue(self)
+
+	def _cancel(self, discard: bool):
+		self._discard = discard
+		if self._task:
+			self._task.cancel()
+		else:
+			self._finish("cancelled", {"type": "cancelled", "path": self.save_path})
+
+	def _finish(self, state: str, message: dict):
+		if self._done.is_set():
+			return
+		self.state = state
+		if self.queue is not None:
+			self.queue.put(message)
+		self._done.set()
+
+
+class DownloadManager:
+	def __init__(self, max_concurrent: int = 3, rate_limit: float = 0, retry_policy: Optional[RetryPolicy] = None):
+		self.max_concurrent = max_concurrent
+		self.rate_limit = rate_limit
+		self.retry_policy = retry_policy or RetryPolicy()
+		self.breaker = get_circuit_breaker()
+		self._loop = asyncio.new_event_loop()
+		self._ready = threading.Event()
+		self._counter = itertools.count()
+		self._handles: List[DownloadHandle] = []
+		self._thread = threading.Thread(target=self._run_loop, name="download-manager", daemon=True)
+		self._thread.start()
+		self._ready.wait()
+
+	def _run_loop(self):
+		asyncio.set_event_loop(self._loop)
+		self._pending = asyncio.PriorityQueue()
+		self._bucket = TokenBucket(self.rate_limit)
+		self._session = None
+		self._workers = [self._loop.create_task(self._worker()) for _ in range(self.max_concurrent)]
+		self._ready.set()
+		self._loop.run_forever()
+
+	def call_soon(self, callback, *args):
+		self._loop.call_soon_threadsafe(callback, *args)
+
+	def set_rate_limit(self, rate_limit: float):
+		self.rate_limit = rate_limit
+		self.call_soon(setattr, self._bucket, "rate", rate_limit)
+
+	def submit(self, url: str, save_path: str, queue=None, expected_sha256: Optional[str] = None, priority: int = 0,
+			   max_retries: Optional[int] = None, mirrors: Optional[List[str]] = None) -> DownloadHandle:
+		handle = DownloadHandle(self, url, save_path, queue, expected_sha256, priority,
+								max_retries or self.retry_policy.max_attempts, mirrors or [])
+		self._handles.append(handle)
+		self.call_soon(self._enqueue, handle)
+		return handle
+
+	def _enqueue(self, handle: DownloadHandle):
+		if handle._resume_event is None:
+			handle._resume_event = asyncio.Event()
+			handle._resume_event.set()
+		self._pending.put_nowait((-handle.priority, next(self._counter), handle))
+
+	def shutdown(self, timeout: float = 5):
+		if not self._thread.is_alive():
+			return
+		for handle in self._handles:
+			if not handle._done.is_set():
+				handle.cancel(discard=False)
+		for handle in self._handles:
+			handle.wait(timeout)
+		asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout)
+		self.call_soon(self._loop.stop)
+		self._thread.join(timeout)
+
+	async def _close(self):
+		for worker in self._workers:
+			worker.cancel()
+		await asyncio.gather(*self._workers, return_exceptions=True)
+		if self._session is not None:
+			await self._session.close()
+
+	async def _get_session(self) -> aiohttp.ClientSession:
+		if self._session is None or self._session.closed:
+			timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+			self._session = aiohttp.ClientSession(timeout=timeout)
+		return self._session
+
+	async def _worker(self):
+		while True:
+			_, _, handle = await self._pending.get()
+			if handle._done.is_set():
+				continue
+			if not handle._resume_event.is_set():
+				# Paused before it started: free the slot, resume() puts it back in line.
+				handle._parked = True
+				continue
+
+			handle.state = "running"
+			handle._task = self._loop.create_task(self._run(handle))
+			await asyncio.wait({handle._task})
+
+	async def _run(self, handle: DownloadHandle):
+		task = os.path.basename(handle.save_path)
+		started = time.monotonic()
+		logging.info(f"Скачивание {task}: {handle.url}", extra={"phase": "download", "task": task, "url": handle.url})
+		try:
+			for mirror in handle.mirrors:
+				if await self._try_mirror(handle, mirror):
+					handle._finish("finished", {"type": "finished", "path": handle.save_path})
+					return
+
+			if await self._download(handle, handle.url, handle.expected_sha256, handle.max_retries):
+				logging.info(
+					f"{task} скачан за {time.monotonic() - started:.1f} с",
+					extra={"phase": "download", "task": task, "bytes": handle.downloaded}
+				)
+				handle._finish("finished", {"type": "finished", "path": handle.save_path})
+			else:
+				handle._finish("error", {
+					"type": "error",
+					"message": f"Не удалось скачать файл за {handle.max_retries} попыток"
+				})
+
+		except asyncio.CancelledError:
+			if handle._discard and os.path.exists(handle.part_path):
+				os.remove(handle.part_path)
+			handle._finish("cancelled", {"type": "cancelled", "path": handle.save_path})
+			raise
+		except aiohttp.ClientError as e:
+			handle._finish("error", {"type": "error", "message": f"Ошибка скачивания: {e}"})
+		except Exception as e:
+			handle._finish("error", {"type": "error", "message": f"Неизвестная ошибка: {e}"})
+
+	async def _try_mirror(self, handle: DownloadHandle, mirror: str) -> bool:
+		url = mirror_url(mirror, handle.url)
+		session = await self._get_session()
+		try:
+			async with session.head(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+				if response.status != 200:
+					logging.info(f"Файл {os.path.basename(handle.save_path)} отсутствует на кэш-сервере {mirror}")
+					return False
+				mirror_sha256 = response.headers.get(DIGEST_HEADER)
+		except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+			logging.info(f"Кэш-сервер {mirror} недоступен: {e}")
+			return False
+
+		if handle.expected_sha256 and mirror_sha256 and mirror_sha256.lower() != handle.expected_sha256.lower():
+			logging.warning(f"Контрольная сумма на кэш-сервере {mirror} не совпадает, пропускаем его")
+			return False
+
+		try:
+			if await self._download(handle, url, handle.expected_sha256 or mirror_sha256, max_retries=2):
+				logging.info(f"{os.path.basename(handle.save_path)} получен с кэш-сервера {mirror}")
+				return True
+		except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+			logging.info(f"Ошибка скачивания с кэш-сервера {mirror}: {e}")
+
+		if os.path.exists(handle.part_path):
+			os.remove(handle.part_path)
+		return False
+
+	async def _verify(self, path: str, expected_sha256: Optional[str]) -> bool:
+		if not expected_sha256:
+			return True
+		file_hash = await self._loop.run_in_executor(None, FileUtils.calculate_sha256, path, 1024 * 1024)
+		return file_hash.lower() == expected_sha256.lower()
+
+	async def _download(self, handle: DownloadHandle, url: str, expected_sha256: Optional[str], max_retries: int) -> bool:
+		if expected_sha256 and os.path.exists(handle.save_path) and await self._verify(handle.save_path, expected_sha256):
+			return True
+
+		session = await self._get_session()
+		part_path = handle.part_path
+		host = CircuitBreaker.host_of(url)
+		handle.total = None
+		handle.downloaded = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+		for attempt in range(1, max_retries + 1):
+			if not self.breaker.allow(host):
+				raise aiohttp.ClientConnectionError(f"{host} временно недоступен (слишком много ошибок подряд)")
+
+			headers = {}
+			if handle.downloaded > 0:
+				headers["Range"] = f"bytes={handle.downloaded}-"
+
+			response_headers = None
+			try:
+				async with session.get(url, headers=headers) as response:
+					if response.status == 416 and handle.downloaded > 0:
+						os.remove(part_path)
+						handle.downloaded = 0
+						handle.total = None
+						continue
+
+					if response.status >= 400:
+						if response.status >= 500:
+							self.breaker.record_failure(host)
+						if not self.retry_policy.is_retryable(response.status, response.headers) or attempt == max_retries:
+							response.raise_for_status()
+						response_headers = response.headers
+						reason = f"HTTP {response.status}"
+					else:
+						if handle.downloaded > 0 and response.status != 206:
+							handle.downloaded = 0
+
+						if handle.total is None and response.content_length is not None:
+							handle.total = handle.downloaded + response.content_length
+
+						await self._receive(handle, response)
+						self.breaker.record_success(host)
+
+						if handle.total and handle.downloaded < handle.total:
+							reason = "соединение оборвалось"
+						elif not await self._verify(part_path, expected_sha256):
+							os.remove(part_path)
+							handle.downloaded = 0
+							handle.total = None
+							reason = "контрольная сумма не совпала"
+						else:
+							os.replace(part_path, handle.save_path)
+							return True
+
+			except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+				self.breaker.record_failure(host)
+				if attempt == max_retries:
+					raise
+				reason = f"ошибка соединения: {e or type(e).__name__}"
+
+			if attempt == max_retries:
+				break
+			wait = self.retry_policy.get_delay(attempt, response_headers)
+			if wait is None:
+				raise aiohttp.ClientError(f"{host} просит подождать дольше {self.retry_policy.max_wait:.0f} с")
+			await self._report_retry(handle, attempt, wait, reason)
+
+		return False
+
+	async def _report_retry(self, handle: DownloadHandle, attempt: int, wait: float, reason: str):
+		handle.retries += 1
+		handle.retry_wait += wait
+		logging.warning(
+			f"{os.path.basename(handle.save_path)}: {reason}, повтор через {wait:.1f} с (попытка {attempt})",
+			extra={"phase": "download", "task": os.path.basename(handle.save_path), "attempt": attempt}
+		)
+		if handle.queue is not None:
+			handle.queue.put({
+				"type": "retry",
+				"attempt": attempt,
+				"wait": round(wait, 1),
+				"reason": reason,
+				"retries": handle.retries,
+				"retry_wait": round(handle.retry_wait, 1)
+			})
+		await asyncio.sleep(wait)
+
+	async def _receive(self, handle: DownloadHandle, response: aiohttp.ClientResponse):
+		mode = "ab" if handle.downloaded > 0 else "wb"
+		# Checked once per transfer so the per-chunk branch costs nothing when debug logging is off.
+		debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+		task = os.path.basename(handle.save_path)
+		with open(handle.part_path, mode) as f:
+			last_time = time.monotonic()
+			chunk_downloaded = 0
+
+			async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+				await handle._resume_event.wait()
+				await self._bucket.consume(len(chunk))
+				f.write(chunk)
+				handle.downloaded += len(chunk)
+				chunk_downloaded += len(chunk)
+				if debug:
+					logging.debug("chunk", extra={"phase": "download", "task": task, "bytes": handle.downloaded, "total": handle.total})
+
+				current_time = time.monotonic()
+				elapsed_time = current_time - last_time
+				if elapsed_time >= 0.5:
+					speed = chunk_downloaded / elapsed_time
+					chunk_downloaded = 0
+					last_time = current_time
+
+					if handle.total and handle.queue is not None:
+						handle.queue.put({
+							"type": "progress",
+							"percentage": int((handle.downloaded / handle.total) * 100),
+							"speed": format_speed(speed)
+						})
+
+
+_manager: Optional[DownloadManager] = None
+_manager_lock = threading.Lock()
+
+
+def configure_download_manager(max_concurrent: int = 3, rate_limit: float = 0,
+							   retry_policy: Optional[RetryPolicy] = None) -> DownloadManager:
+	global _manager
+	with _manager_lock:
+		if _manager is None:
+			_manager = DownloadManager(max_concurrent=max_concurrent, rate_limit=rate_limit, retry_policy=retry_policy)
+		else:
+			_manager.set_rate_limit(rate_limit)
+			if retry_policy is not None:
+				_manager.retry_policy = retry_policy
+		return _manager
+
+
+def get_download_manager() -> DownloadManager:
+	return _manager or configure_download_manager()
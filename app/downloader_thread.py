@@ -1,112 +1,71 @@
-import threading
-import time
-import requests
 import os
-import hashlib
+import queue
+from typing import List, Optional
 
+from app.download_manager import format_speed, get_download_manager
 
-class DownloaderThread(threading.Thread):
-	def __init__(self, url, save_path, queue, expected_sha256=None, version=None, max_retries=5):
-		super().__init__()
+
+class DownloaderThread:
+	def __init__(self, url, save_path, queue, expected_sha256=None, version=None, max_retries=None, mirrors=None, priority=0):
 		self.url = url
 		self.save_path = save_path
 		self.queue = queue
-		self.daemon = True
 		self.max_retries = max_retries
 		self.expected_sha256 = expected_sha256
 		self.version = version
+		self.mirrors = mirrors or []
+		self.priority = priority
+		self.handle = None
 
 	def _format_speed(self, speed_bytes_per_sec):
-		if speed_bytes_per_sec > 1024 * 1024:
-			return f"{speed_bytes_per_sec / (1024 * 1024):.2f} MB/s"
-		if speed_bytes_per_sec > 1024:
-			return f"{speed_bytes_per_sec / 1024:.2f} KB/s"
-		return f"{speed_bytes_per_sec:.2f} B/s"
-
-	def _calculate_sha256(self, file_path):
-		sha256 = hashlib.sha256()
-		with open(file_path, "rb") as f:
-			for chunk in iter(lambda: f.read(8192), b""):
-				sha256.update(chunk)
-		return sha256.hexdigest()
-
-	def run(self):
-		try:
-			if os.path.exists(self.save_path) and self.version:
-				local_hash = self._calculate_sha256(self.save_path)
-				if self.expected_sha256 and local_hash != self.expected_sha256:
-					os.remove(self.save_path)
-
-			total_size = None
-			downloaded_size = 0
-
-			if os.path.exists(self.save_path):
-				downloaded_size = os.path.getsize(self.save_path)
-
-			for attempt in range(1, self.max_retries + 1):
-				headers = {}
-				if downloaded_size > 0:
-					headers["Range"] = f"bytes={downloaded_size}-"
-
-				response = requests.get(self.url, stream=True, timeout=30, headers=headers)
-				response.raise_for_status()
-
-				if total_size is None:
-					content_length = response.headers.get("content-length")
-					if content_length is not None:
-						total_size = downloaded_size + int(content_length)
-
-				mode = "ab" if downloaded_size > 0 else "wb"
-				with open(self.save_path, mode) as f:
-					last_time = time.time()
-					chunk_downloaded = 0
-
-					for chunk in response.iter_content(chunk_size=8192):
-						if not chunk:
-							continue
-						f.write(chunk)
-						downloaded_size += len(chunk)
-						chunk_downloaded += len(chunk)
-
-						current_time = time.time()
-						elapsed_time = current_time - last_time
-
-						if elapsed_time >= 0.5:
-							speed = chunk_downloaded / elapsed_time if elapsed_time > 0 else 0
-							speed_str = self._format_speed(speed)
-							chunk_downloaded = 0
-							last_time = current_time
-
-							if total_size:
-								percentage = int((downloaded_size / total_size) * 100)
-								self.queue.put({
-									"type": "progress",
-									"percentage": percentage,
-									"speed": speed_str
-								})
-
-				if total_size and downloaded_size < total_size:
-					time.sleep(1)
-					continue
-
-				if self.expected_sha256:
-					file_hash = self._calculate_sha256(self.save_path)
-					if file_hash.lower() != self.expected_sha256.lower():
-						os.remove(self.save_path)
-						downloaded_size = 0
-						total_size = None
-						time.sleep(1)
-						continue
-
-				self.queue.put({"type": "finished", "path": self.save_path})
-				return
-
-			self.queue.put({
-				"type": "error",
-				"message": f"Не удалось скачать файл за {self.max_retries} попыток"
-			})
-
-		except requests.RequestException as e:
-			self.queue.put({"type": "error", "message": f"Ошибка скачивания: {e}"})
-		except Exception as e:
-			self.queue.put({"type": "error", "message": f"Неизвестная ошибка: {e}"})
+		return format_speed(speed_bytes_per_sec)
+
+	def start(self):
+		self.handle = get_download_manager().submit(
+			self.url,
+			self.save_path,
+			self.queue,
+			expected_sha256=self.expected_sha256,
+			priority=self.priority,
+			max_retries=self.max_retries,
+			mirrors=self.mirrors
+		)
+		return self.handle
+
+	def pause(self):
+		if self.handle:
+			self.handle.pause()
+
+	def resume(self):
+		if self.handle:
+			self.handle.resume()
+
+	def cancel(self):
+		if self.handle:
+			self.handle.cancel()
+
+	def join(self, timeout=None):
+		if self.handle:
+			self.handle.wait(timeout)
+
+
+def download_blocking(url: str, save_path: str, expected_sha256: Optional[str] = None,
+					  mirrors: Optional[List[str]] = None) -> str:
+	download_queue = queue.Queue()
+	DownloaderThread(url, save_path, download_queue, expected_sha256=expected_sha256, mirrors=mirrors).start()
+
+	while True:
+		msg = download_queue.get()
+		if msg["type"] == "progress":
+			print(f"\r  {os.path.basename(save_path)}: {msg['percentage']}% ({msg['speed']})", end="", flush=True)
+		elif msg["type"] == "finished":
+			print(f"\r  {os.path.basename(save_path)}: готово.{' ' * 20}")
+			return msg["path"]
+		elif msg["type"] == "error":
+			print()
+			raise RuntimeError(msg["message"])
+		elif msg["type"] == "retry":
+			print(f"\r  {os.path.basename(save_path)}: {msg['reason']}, повтор через {msg['wait']} с (попытка {msg['attempt']})")
+		elif msg["type"] == "cancelled":
+			print()
+			raise RuntimeError("Скачивание отменено")
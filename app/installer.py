@@ -5,24 +5,33 @@ import queue
 import subprocess
 import tarfile
 import shutil
-import stat
+import threading
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
 import platform
 
+from app.download_manager import get_download_manager
 from app.downloader_thread import DownloaderThread
+from app.plugins import PluginError, PluginInstaller, load_plugin_manifest
+from app.service_files import ServiceFiles
 from main import FileUtils, GitHubAPI, JavaUtils, get_resource_path
+from utils.bundle_utils import BundleError
+from utils.cache_server import resolve_mirrors
+from utils.install_manifest import InstallManifest
+from utils.release_catalog import ReleaseCatalog
 
 
 class InstallerApp(ctk.CTk):
 	IS_WINDOWS = platform.system() == "Windows"
 	IS_LINUX = platform.system() == "Linux"
 
-	def __init__(self):
+	def __init__(self, bundle=None, mirrors=None, core_version=None):
 		from app.steps import Steps
 
 		super().__init__()
 
+		self.bundle = bundle
+
 		ctk.set_appearance_mode("System")
 		ctk.set_default_color_theme("blue")
 
@@ -62,7 +71,14 @@ class InstallerApp(ctk.CTk):
 			self.after(10, self.destroy)
 			return
 
+		self.core_version = core_version or self.config.get("core_version", "latest")
+		self.mirrors = [] if self.bundle else resolve_mirrors(self.config, mirrors)
+		if self.mirrors:
+			logging.info(f"Кэш-серверы: {', '.join(self.mirrors)}")
+
 		self.current_download = None
+		self.core_download_info = None
+		self.active_download = None
 		self.download_queue = queue.Queue()
 		self.current_step_index = 0
 
@@ -76,19 +92,25 @@ class InstallerApp(ctk.CTk):
 			Steps.create_welcome_step, Steps.create_license_step,
 			Steps.create_java_check_step, Steps.create_java_install_step,
 			Steps.create_path_selection_step, Steps.create_core_download_step,
-			Steps.create_file_creation_step, Steps.create_final_step
+			Steps.create_file_creation_step, Steps.create_plugin_install_step, Steps.create_final_step
 		]:
 			frame = ctk.CTkFrame(self.container, fg_color="transparent")
 			frame.grid(row=0, column=0, sticky="nsew")
 			create_step_func(self, frame)
 			self.steps.append(frame)
 
+		self.protocol("WM_DELETE_WINDOW", self.destroy)
 		self.go_to_step(0)
 		self._check_download_queue()
 
 		if "get_download_url" not in dir(GitHubAPI):
 			messagebox.showwarning("Отсутствуют утилиты", "Вспомогательные файлы не найдены. Функциональность будет ограничена.")
 
+	def destroy(self):
+		# Stop transfers before the window goes away; partial files stay in the cache to be resumed.
+		get_download_manager().shutdown()
+		super().destroy()
+
 	def create_navigation_buttons(self, parent, back_func, next_func, next_text="Далее"):
 		nav_frame = ctk.CTkFrame(parent, fg_color="transparent")
 		nav_frame.pack(side="bottom", fill="x", padx=self.PADDING_X, pady=self.PADDING_Y)
@@ -117,15 +139,17 @@ class InstallerApp(ctk.CTk):
 			self._start_core_download()
 		elif index == 6:
 			self._create_service_files()
+		elif index == 7:
+			self._start_plugin_install()
 
 	def _run_java_check(self):
 		found, version_str, major_version = JavaUtils.check_java_version()
 		if found and JavaUtils.is_version_supported(major_version, self.config["required_java_version"]):
-			logging.info(f"Найдена подходящая версия Java: {version_str}")
+			logging.info(f"Найдена подходящая версия Java: {version_str}", extra={"phase": "java_check"})
 			messagebox.showinfo("Java найдена", f"Обнаружена Java версии {version_str}. Установка Java будет пропущена.")
 			self.go_to_step(4)
 		else:
-			logging.warning("Подходящая версия Java не найдена.")
+			logging.warning("Подходящая версия Java не найдена.", extra={"phase": "java_check"})
 			if version_str:
 				messagebox.showwarning(
 					"Java не найдена",
@@ -143,33 +167,79 @@ class InstallerApp(ctk.CTk):
 
 	def _create_service_files(installer: "InstallerApp"):
 		try:
-			if installer.IS_WINDOWS:
-				template = get_resource_path('resources/server_files/start.cmd')
-				dst = os.path.join(installer.install_path, 'start.cmd')
-			else:
-				template = get_resource_path('resources/server_files/start.sh')
-				dst = os.path.join(installer.install_path, 'start.sh')
-
-			with open(template, 'r', encoding='utf-8') as f:
-				content = (
-					f.read()
-					.replace('{MEMORY}', '4')
-					.replace('{CORE_NAME}', installer.config['server_jar_name'])
-				)
-
-			FileUtils.write_text_file(dst, content)
-
-			if installer.IS_LINUX:
-				st = os.stat(dst)
-				os.chmod(dst, st.st_mode | stat.S_IEXEC)
-
-			logging.info(f"{os.path.basename(dst)} создан.")
+			profile = ServiceFiles.get_profile(installer.config)
+			logging.info(
+				f"Профиль оборудования: {profile['cpu_count']} CPU, {profile['total_memory_gb']} ГБ ОЗУ, "
+				f"серверу выделено {profile['heap_gb']} ГБ",
+				extra={"phase": "service_files"}
+			)
+			written = ServiceFiles.write(installer.config, installer.install_path, installer.IS_WINDOWS, profile)
+			dst, supervisor_path, supervisor_config_path = written
+			# supervisor.py is shipped as-is, so unlike the scripts and their config any change to it is damage.
+			installer._record_manifest("scripts", [dst, supervisor_config_path], {"editable": True})
+			installer._record_manifest("supervisor", [supervisor_path], {})
+
+			for path in ServiceFiles.write_server_config(installer.config, installer.install_path, profile):
+				logging.info(f"{os.path.basename(path)} создан.", extra={"phase": "server_config", "path": path})
+
+			logging.info(f"{os.path.basename(dst)} и supervisor.py созданы.", extra={"phase": "service_files", "path": dst})
 			installer.go_to_step(7)
 		except Exception as e:
-			logging.error(f"Ошибка при создании служебных файлов: {e}")
+			logging.error(f"Ошибка при создании служебных файлов: {e}", extra={"phase": "service_files"})
 			messagebox.showerror("Ошибка", f"Не удалось создать файлы: {e}")
 			installer.go_to_step(4)
 
+	def _start_plugin_install(self):
+		try:
+			entries = load_plugin_manifest(self.config)
+		except PluginError as e:
+			logging.error(str(e), extra={"phase": "plugins"})
+			messagebox.showerror("Ошибка", f"Некорректный список плагинов: {e}")
+			self.go_to_step(8)
+			return
+		if not entries:
+			self.go_to_step(8)
+			return
+
+		plugin_installer = PluginInstaller(
+			self.config, self.install_path, self.mirrors,
+			on_progress=self.download_queue.put, on_retry=self.download_queue.put
+		)
+		# An offline bundle must not touch the network: plugins are only placed if the lock file and cache cover them.
+		if self.bundle and not plugin_installer.can_install_offline(entries):
+			logging.warning("Плагины пропущены: их нет в lock-файле или кэше, а установка идёт из бандла.",
+							extra={"phase": "plugins"})
+			messagebox.showwarning(
+				"Плагины пропущены",
+				"Установка из бандла идёт без сети, а плагинов нет в кэше.\n"
+				"Установите их позже командой plugins."
+			)
+			self.go_to_step(8)
+			return
+
+		self.current_download = "plugins"
+		self.plugin_progress.set(0)
+		self.plugin_status_label.configure(text=f"Установка плагинов: {len(entries)}...")
+
+		def run():
+			try:
+				paths = plugin_installer.install(entries)
+			except Exception as e:
+				logging.error(f"Ошибка установки плагинов: {e}", extra={"phase": "plugins"})
+				self.download_queue.put({"type": "plugins_error", "message": str(e)})
+				return
+			self.download_queue.put({"type": "plugins_finished", "count": len(paths)})
+
+		threading.Thread(target=run, daemon=True).start()
+
+	def _finish_plugin_install(self, msg):
+		if msg["type"] == "plugins_finished":
+			self.go_to_step(8)
+		elif messagebox.askretrycancel("Ошибка", f"Не удалось установить плагины:\n{msg['message']}"):
+			self._start_plugin_install()
+		else:
+			self.go_to_step(8)
+
 	def _set_java_ui_state(self, state: str):
 		if state == "downloading":
 			self.java_selection_frame.pack_forget()
@@ -183,41 +253,59 @@ class InstallerApp(ctk.CTk):
 	def _download_java(self):
 		version = self.java_version_var.get()
 
-		if self.IS_WINDOWS:
-			url = self.config["java_urls"]["windows"].get(version)
-		elif self.IS_LINUX:
-			arch = platform.machine().lower()
-			if arch in ("x86_64", "amd64"):
-				arch_key = "x64"
-			elif arch in ("aarch64", "arm64"):
-				arch_key = "aarch64"
+		platform_key = JavaUtils.get_platform_key()
+		if platform_key is None:
+			if self.IS_LINUX:
+				messagebox.showerror("Ошибка", f"Архитектура {platform.machine().lower()} не поддерживается.")
 			else:
-				messagebox.showerror("Ошибка", f"Архитектура {arch} не поддерживается.")
-				return
+				messagebox.showerror("Ошибка", "Ваша ОС пока не поддерживается.")
+			return
 
-			url = self.config["java_urls"]["linux"][version].get(arch_key)
-		else:
-			messagebox.showerror("Ошибка", "Ваша ОС пока не поддерживается.")
+		if self.bundle:
+			self._install_java_from_bundle(platform_key, version)
 			return
 
+		url = JavaUtils.get_java_url(self.config["java_urls"], platform_key, version)
 		if not url:
 			messagebox.showerror("Ошибка", f"URL для Java {version} не найден в конфигурации.")
 			return
 
-		temp_dir = os.path.join(os.path.expanduser("~"), ".lumi-installer", "downloads")
-		os.makedirs(temp_dir, exist_ok=True)
-
-		save_path = os.path.join(temp_dir, os.path.basename(url))
+		save_path = os.path.join(FileUtils.get_download_dir(), os.path.basename(url))
 
 		self._set_java_ui_state("downloading")
 		self.java_download_label.configure(text="Подготовка к скачиванию...")
 		self.java_progress.set(0)
 		self.current_download = "java"
 
-		DownloaderThread(url, save_path, self.download_queue).start()
+		self.active_download = DownloaderThread(url, save_path, self.download_queue, mirrors=self.mirrors)
+		self.active_download.start()
+
+	def _install_java_from_bundle(self, platform_key: str, version: str):
+		arcname = self.bundle.get_java_path(platform_key, version)
+		if not arcname:
+			available = ", ".join(self.bundle.get_java_versions(platform_key)) or "нет"
+			messagebox.showerror("Ошибка", f"Java {version} отсутствует в бандле. Доступные версии: {available}.")
+			return
+
+		self._set_java_ui_state("downloading")
+		self.java_download_label.configure(text="Распаковка Java из бандла...")
+		self.java_progress.set(0)
+		self.current_download = "java"
+
+		def run():
+			# Extracting and hashing a full JDK takes a while, so it stays off the Tk thread like a download.
+			try:
+				installer_path = self.bundle.extract_cached(arcname, FileUtils.get_download_dir())
+			except (BundleError, OSError) as e:
+				logging.error(f"Ошибка извлечения Java из бандла: {e}")
+				self.download_queue.put({"type": "error", "message": f"Не удалось извлечь Java из бандла: {e}"})
+				return
+			self.download_queue.put({"type": "finished", "path": installer_path})
+
+		threading.Thread(target=run, daemon=True).start()
 
 	def _install_java(self, installer_path):
-		logging.info(f"Обработка установщика Java: {installer_path}")
+		logging.info(f"Обработка установщика Java: {installer_path}", extra={"phase": "java_install", "path": installer_path})
 		try:
 			if self.IS_WINDOWS:
 				if installer_path.lower().endswith(".msi"):
@@ -258,6 +346,13 @@ class InstallerApp(ctk.CTk):
 					shutil.rmtree(java_dest, ignore_errors=True)
 
 				shutil.move(extracted_root, java_dest)
+				self._record_manifest("java", InstallManifest.walk(java_dest), {
+					"version": self.java_version_var.get(),
+					"platform": JavaUtils.get_platform_key(),
+					"archive": os.path.basename(installer_path),
+					"archive_sha256": FileUtils.calculate_sha256(installer_path),
+					"root": root
+				})
 
 				messagebox.showinfo(
 					"Готово",
@@ -267,7 +362,7 @@ class InstallerApp(ctk.CTk):
 				self.go_to_step(2)
 
 		except Exception as e:
-			logging.error(f"Ошибка при установке Java: {e}")
+			logging.error(f"Ошибка при установке Java: {e}", extra={"phase": "java_install"})
 			try:
 				download_folder = os.path.dirname(installer_path)
 				self._open_folder(download_folder)
@@ -300,19 +395,99 @@ class InstallerApp(ctk.CTk):
 		self.go_to_step(5)
 
 	def _start_core_download(self):
-		repo_owner, repo_name = self.config["github_repo"].split("/")
-		github_api = GitHubAPI(repo_owner, repo_name)
+		if self.bundle:
+			self._install_core_from_bundle()
+			return
+
+		self.current_download = "core"
+		self.core_download_label.configure(text=f"Поиск ядра версии {self.core_version}...")
+		# The GitHub API may back off for minutes when rate limited, so the lookup runs off the Tk thread.
+		threading.Thread(target=self._resolve_core, daemon=True).start()
+
+	def _resolve_core(self):
+		catalog = ReleaseCatalog.from_config(self.config, FileUtils.get_app_dir(), on_retry=self.download_queue.put)
+		try:
+			catalog.update()
+			download_info = catalog.resolve(self.core_version)
+		except Exception as e:
+			logging.error(f"Ошибка поиска ядра: {e}", extra={"phase": "core_download"})
+			download_info = None
+		self.download_queue.put({"type": "resolved", "info": download_info})
+
+	def _download_core(self, download_info):
+		if not download_info:
+			messagebox.showerror("Ошибка", f"Не удалось найти ядро версии '{self.core_version}' на GitHub.")
+			self.go_to_step(4)
+			return
 
-		download_url = github_api.get_download_url()
-		if not download_url:
-			messagebox.showerror("Ошибка", "Не удалось получить ссылку на скачивание ядра с GitHub.")
+		download_url = download_info["download_url"]
+		save_path = os.path.join(FileUtils.get_download_dir(), download_info["asset_name"])
+		self.core_download_info = download_info
+		self.active_download = DownloaderThread(
+			download_url, save_path, self.download_queue,
+			expected_sha256=download_info["sha256"], mirrors=self.mirrors
+		)
+		self.active_download.start()
+		logging.info(
+			f"Начало скачивания ядра {download_info['version']} с {download_url}",
+			extra={"phase": "core_download", "task": download_info["asset_name"], "url": download_url, "total": download_info["size"]}
+		)
+
+	def _install_core_from_bundle(self):
+		release = self.bundle.get_release()
+		if not release:
+			messagebox.showerror("Ошибка", "В бандле нет ядра сервера.")
 			self.go_to_step(4)
 			return
 
 		save_path = os.path.join(self.install_path, self.config["server_jar_name"])
-		self.current_download = "core"
-		DownloaderThread(download_url, save_path, self.download_queue).start()
-		logging.info(f"Начало скачивания ядра с {download_url}")
+		self.core_download_label.configure(text=f"Распаковка ядра {release['version']} из бандла...")
+		self.update_idletasks()
+
+		try:
+			self.bundle.extract(release["path"], save_path)
+		except (BundleError, OSError) as e:
+			logging.error(f"Ошибка извлечения ядра из бандла: {e}")
+			messagebox.showerror("Ошибка", f"Не удалось извлечь ядро из бандла: {e}")
+			self.go_to_step(4)
+			return
+
+		self._record_manifest("core", [save_path], {
+			"version": release["version"],
+			"asset_name": release["asset_name"],
+			"download_url": self.bundle.manifest["files"][release["path"]].get("url")
+		})
+		logging.info(
+			f"Ядро {release['version']} установлено из бандла {self.bundle.bundle_path}",
+			extra={"phase": "core_download", "task": release["asset_name"], "path": save_path}
+		)
+		self.core_progress.set(1)
+		self.go_to_step(6)
+
+	def _place_core(self, downloaded_path):
+		save_path = os.path.join(self.install_path, self.config["server_jar_name"])
+		try:
+			shutil.copy2(downloaded_path, save_path)
+		except OSError as e:
+			logging.error(f"Ошибка копирования ядра: {e}", extra={"phase": "core_download"})
+			messagebox.showerror("Ошибка", f"Не удалось скопировать ядро в папку установки: {e}")
+			self.go_to_step(4)
+			return
+
+		info = self.core_download_info
+		self._record_manifest("core", [save_path], {
+			"version": info["version"],
+			"asset_name": info["asset_name"],
+			"download_url": info["download_url"]
+		})
+		self.go_to_step(6)
+
+	def _record_manifest(self, component, paths, source):
+		# The manifest only serves verify/repair, so a failure here must not break the install itself.
+		try:
+			InstallManifest(self.install_path).record(component, paths, source)
+		except OSError as e:
+			logging.warning(f"Не удалось обновить манифест установки ({component}): {e}", extra={"phase": "manifest"})
 
 	def _check_download_queue(self):
 		try:
@@ -328,11 +503,30 @@ class InstallerApp(ctk.CTk):
 					self.core_progress.set(percentage / 100)
 					self.core_download_label.configure(text=f"Скачивание ядра... {percentage}% ({speed})")
 
+			elif msg["type"] == "retry":
+				text = f"{msg['reason']}. Повтор через {msg['wait']} с (попытка {msg['attempt']})..."
+				if self.current_download == "java":
+					self.java_download_label.configure(text=text)
+				elif self.current_download == "core":
+					self.core_download_label.configure(text=text)
+				elif self.current_download == "plugins":
+					self.plugin_status_label.configure(text=text)
+
+			elif msg["type"] == "plugin_progress":
+				self.plugin_progress.set(msg["fraction"])
+				self.plugin_status_label.configure(text=msg["text"])
+
+			elif msg["type"] in ("plugins_finished", "plugins_error"):
+				self._finish_plugin_install(msg)
+
+			elif msg["type"] == "resolved":
+				self._download_core(msg["info"])
+
 			elif msg["type"] == "finished":
 				if self.current_download == "java":
 					self._install_java(msg["path"])
 				elif self.current_download == "core":
-					self.go_to_step(6)
+					self._place_core(msg["path"])
 
 			elif msg["type"] == "error":
 				messagebox.showerror("Ошибка", msg["message"])
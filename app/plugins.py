@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import unquote, urlsplit
+
+from app.downloader_thread import DownloaderThread
+from main import FileUtils
+from utils.install_manifest import InstallManifest
+from utils.release_catalog import CatalogError, ReleaseCatalog
+
+LOCK_NAME = "plugins.lock.json"
+LOCK_FORMAT = 1
+DEFAULT_PLUGIN_ASSET = "*.jar"
+
+
+class PluginError(Exception):
+	pass
+
+
+def get_plugin_cache_dir() -> str:
+	cache_dir = os.path.join(FileUtils.get_app_dir(), "plugins")
+	os.makedirs(cache_dir, exist_ok=True)
+	return cache_dir
+
+
+def load_plugin_manifest(config: dict, manifest_path: Optional[str] = None) -> List[Dict]:
+	if manifest_path:
+		try:
+			with open(manifest_path, "r", encoding="utf-8") as f:
+				data = json.load(f)
+		except (OSError, ValueError) as e:
+			raise PluginError(f"Не удалось прочитать манифест плагинов {manifest_path}: {e}")
+		entries = data.get("plugins", []) if isinstance(data, dict) else data
+	else:
+		entries = config.get("plugins", [])
+
+	names = set()
+	for entry in entries:
+		name = entry.get("name")
+		if not name:
+			raise PluginError(f"У плагина не указано имя: {entry}")
+		if name in names:
+			raise PluginError(f"Плагин {name} указан дважды.")
+		if bool(entry.get("url")) == bool(entry.get("repo")):
+			raise PluginError(f"Для плагина {name} нужно указать ровно одно из полей url или repo.")
+		names.add(name)
+	return entries
+
+
+class PluginInstaller:
+	def __init__(self, config: dict, install_path: str, mirrors: Optional[List[str]] = None,
+				 on_progress: Optional[Callable[[Dict], None]] = None, on_retry: Optional[Callable[[Dict], None]] = None):
+		self.config = config
+		self.install_path = install_path
+		self.mirrors = mirrors or []
+		self.on_progress = on_progress
+		self.on_retry = on_retry
+		self.lock_path = os.path.join(install_path, LOCK_NAME)
+		self.lock = self._load_lock()
+		self._catalogs: Dict[str, ReleaseCatalog] = {}
+
+	def _load_lock(self) -> Dict:
+		try:
+			with open(self.lock_path, "r", encoding="utf-8") as f:
+				lock = json.load(f)
+			if lock.get("format") == LOCK_FORMAT:
+				return lock
+		except (FileNotFoundError, json.JSONDecodeError):
+			pass
+		return {"format": LOCK_FORMAT, "plugins": {}}
+
+	def _save_lock(self, plugins: Dict[str, Dict]):
+		self.lock = {"format": LOCK_FORMAT, "updated": int(time.time()), "plugins": plugins}
+		tmp_path = self.lock_path + ".part"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self.lock, f, ensure_ascii=False, indent="\t", sort_keys=True)
+		os.replace(tmp_path, self.lock_path)
+
+	def locked_entries(self) -> List[Dict]:
+		return [plugin["entry"] for plugin in self.lock["plugins"].values()]
+
+	def can_install_offline(self, entries: List[Dict]) -> bool:
+		for entry in entries:
+			locked = self.lock["plugins"].get(entry["name"])
+			if not (locked and locked["entry"] == entry and self._is_cached(locked)):
+				return False
+		return True
+
+	def _report_progress(self, fraction: float, text: str):
+		if self.on_progress:
+			self.on_progress({"type": "plugin_progress", "fraction": fraction, "text": text})
+
+	@staticmethod
+	def cache_path(sha256: str) -> str:
+		return os.path.join(get_plugin_cache_dir(), f"{sha256}.jar")
+
+	def _catalog(self, repo: str, asset_pattern: str) -> ReleaseCatalog:
+		key = f"{repo}:{asset_pattern}"
+		if key not in self._catalogs:
+			catalog = ReleaseCatalog.from_config(
+				self.config, FileUtils.get_app_dir(), on_retry=self.on_retry, repo=repo, asset_pattern=asset_pattern
+			)
+			catalog.update()
+			self._catalogs[key] = catalog
+		return self._catalogs[key]
+
+	def _resolve_entry(self, entry: Dict) -> Dict:
+		name = entry["name"]
+		pinned_sha256 = entry.get("sha256")
+		if entry.get("repo"):
+			spec = entry.get("version", "latest")
+			try:
+				info = self._catalog(entry["repo"], entry.get("asset", DEFAULT_PLUGIN_ASSET)).resolve(spec)
+			except CatalogError as e:
+				raise PluginError(f"{name}: {e}")
+			if not info:
+				raise PluginError(f"{name}: версия '{spec}' не найдена в {entry['repo']}.")
+			if pinned_sha256 and info["sha256"] and pinned_sha256 != info["sha256"]:
+				raise PluginError(f"{name}: контрольная сумма релиза {info['version']} не совпадает с указанной в манифесте.")
+			return {
+				"entry": entry,
+				"version": info["version"],
+				"url": info["download_url"],
+				"file_name": info["asset_name"],
+				"size": info["size"],
+				"sha256": pinned_sha256 or info["sha256"]
+			}
+
+		return {
+			"entry": entry,
+			"version": entry.get("version"),
+			"url": entry["url"],
+			"file_name": entry.get("file") or os.path.basename(unquote(urlsplit(entry["url"]).path)) or f"{name}.jar",
+			"size": None,
+			"sha256": pinned_sha256
+		}
+
+	def resolve(self, entries: List[Dict], update: bool = False) -> Dict[str, Dict]:
+		resolved = {}
+		for entry in entries:
+			locked = self.lock["plugins"].get(entry["name"])
+			# An unchanged manifest entry keeps its locked resolution, so re-provisioning never asks GitHub again.
+			if not update and locked and locked["entry"] == entry and locked.get("sha256"):
+				resolved[entry["name"]] = locked
+			else:
+				self._report_progress(0, f"Поиск плагина {entry['name']}...")
+				resolved[entry["name"]] = self._resolve_entry(entry)
+		return resolved
+
+	def _is_cached(self, plugin: Dict) -> bool:
+		if not plugin.get("sha256"):
+			return False
+		path = self.cache_path(plugin["sha256"])
+		if not os.path.isfile(path):
+			return False
+		if FileUtils.calculate_sha256(path) == plugin["sha256"]:
+			return True
+		logging.warning(f"Повреждённый файл в кэше плагинов удалён: {path}", extra={"phase": "plugins", "path": path})
+		os.remove(path)
+		return False
+
+	def _store(self, plugin: Dict, downloaded_path: str):
+		sha256 = FileUtils.calculate_sha256(downloaded_path)
+		if not plugin["sha256"]:
+			logging.warning(
+				f"Для {plugin['entry']['name']} не указана контрольная сумма, в lock-файл записана {sha256}",
+				extra={"phase": "plugins", "task": plugin["entry"]["name"]}
+			)
+			plugin["sha256"] = sha256
+		plugin["size"] = os.path.getsize(downloaded_path)
+		shutil.move(downloaded_path, self.cache_path(sha256))
+
+	def fetch(self, resolved: Dict[str, Dict]):
+		pending = {name: plugin for name, plugin in resolved.items() if not self._is_cached(plugin)}
+		if not pending:
+			return
+
+		# Every transfer is submitted up front; the download manager runs them side by side within its limits.
+		download_dir = os.path.join(FileUtils.get_download_dir(), "plugins")
+		os.makedirs(download_dir, exist_ok=True)
+		jobs = []
+		for name, plugin in pending.items():
+			download_queue = queue.Queue()
+			save_path = os.path.join(download_dir, f"{name}-{plugin['file_name']}")
+			DownloaderThread(
+				plugin["url"], save_path, download_queue, expected_sha256=plugin["sha256"], mirrors=self.mirrors
+			).start()
+			jobs.append((name, plugin, download_queue))
+			logging.info(f"Скачивание плагина {name} с {plugin['url']}",
+						 extra={"phase": "plugins", "task": name, "url": plugin["url"]})
+
+		errors = []
+		for index, (name, plugin, download_queue) in enumerate(jobs):
+			while True:
+				msg = download_queue.get()
+				if msg["type"] == "progress":
+					self._report_progress(
+						(index + msg["percentage"] / 100) / len(jobs),
+						f"Скачивание плагина {name} ({index + 1}/{len(jobs)})... {msg['percentage']}% ({msg['speed']})"
+					)
+				elif msg["type"] == "finished":
+					self._store(plugin, msg["path"])
+					logging.info(f"Плагин {name} скачан", extra={"phase": "plugins", "task": name, "path": msg["path"]})
+					self._report_progress((index + 1) / len(jobs), f"Плагин {name} скачан ({index + 1}/{len(jobs)})")
+					break
+				elif msg["type"] == "error":
+					errors.append(f"{name}: {msg['message']}")
+					break
+				elif msg["type"] == "cancelled":
+					errors.append(f"{name}: скачивание отменено")
+					break
+				elif msg["type"] == "retry":
+					text = f"{name}: {msg['reason']}, повтор через {msg['wait']} с (попытка {msg['attempt']})"
+					logging.info(text, extra={"phase": "plugins", "task": name})
+					self._report_progress(index / len(jobs), text)
+
+		if errors:
+			raise PluginError("Не удалось скачать плагины:\n" + "\n".join(errors))
+
+	@staticmethod
+	def _place(source: str, destination: str):
+		# A hard link keeps one copy on disk for every instance sharing the cache; copy where links are unavailable.
+		tmp_path = destination + ".part"
+		if os.path.lexists(tmp_path):
+			os.remove(tmp_path)
+		try:
+			os.link(source, tmp_path)
+		except OSError:
+			shutil.copy2(source, tmp_path)
+		os.replace(tmp_path, destination)
+
+	def link(self, resolved: Dict[str, Dict]) -> List[str]:
+		plugins_dir = os.path.join(self.install_path, "plugins")
+		os.makedirs(plugins_dir, exist_ok=True)
+
+		wanted = {plugin["file_name"] for plugin in resolved.values()}
+		for name, locked in self.lock["plugins"].items():
+			path = os.path.join(plugins_dir, locked["file_name"])
+			# Only files this installer placed are removed; anything the admin dropped in by hand stays.
+			if locked["file_name"] not in wanted and os.path.isfile(path) \
+					and FileUtils.calculate_sha256(path) == locked["sha256"]:
+				os.remove(path)
+				logging.info(f"Плагин {name} удалён", extra={"phase": "plugins", "task": name, "path": path})
+				self._report_progress(1, f"Плагин {name} удалён")
+
+		paths = []
+		for name, plugin in resolved.items():
+			path = os.path.join(plugins_dir, plugin["file_name"])
+			if not (os.path.isfile(path) and FileUtils.calculate_sha256(path) == plugin["sha256"]):
+				self._place(self.cache_path(plugin["sha256"]), path)
+				version = f" {plugin['version']}" if plugin.get("version") else ""
+				logging.info(f"Плагин {name}{version} установлен", extra={"phase": "plugins", "task": name, "path": path})
+				self._report_progress(1, f"Плагин {name}{version} установлен")
+			paths.append(path)
+		return paths
+
+	def install(self, entries: List[Dict], update: bool = False) -> List[str]:
+		resolved = self.resolve(entries, update=update)
+		self.fetch(resolved)
+		self._report_progress(1, "Установка плагинов...")
+		paths = self.link(resolved)
+		self._save_lock(resolved)
+		InstallManifest(self.install_path).record("plugins", paths, {"lock": LOCK_NAME})
+		logging.info(f"Плагинов установлено: {len(paths)}", extra={"phase": "plugins", "path": self.install_path})
+		return paths
@@ -0,0 +1,163 @@
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from app.downloader_thread import download_blocking
+from app.plugins import PluginInstaller
+from app.service_files import ServiceFiles
+from main import FileUtils, JavaUtils
+from utils.install_manifest import InstallManifest
+
+PROBLEMS = {
+	"missing": "отсутствует",
+	"size": "изменён размер",
+	"digest": "не совпадает контрольная сумма",
+	"modified": "изменён вручную"
+}
+
+
+def _cached_file(name: str, sha256: Optional[str]) -> Optional[str]:
+	path = os.path.join(FileUtils.get_download_dir(), name)
+	if os.path.isfile(path) and (not sha256 or FileUtils.calculate_sha256(path) == sha256):
+		return path
+	return None
+
+
+def _repair_core(manifest: InstallManifest, relpaths: List[str], mirrors: List[str]):
+	source = manifest.components["core"]["source"]
+	sha256 = manifest.files[relpaths[0]]["sha256"]
+
+	cached = _cached_file(source["asset_name"], sha256)
+	if cached is None:
+		print(f"Ядро {source.get('version')} не найдено в кэше, скачиваем заново.")
+		cached = download_blocking(
+			source["download_url"], os.path.join(FileUtils.get_download_dir(), source["asset_name"]), sha256, mirrors
+		)
+
+	for relpath in relpaths:
+		shutil.copy2(cached, os.path.join(manifest.install_path, *relpath.split("/")))
+
+
+def _repair_java(config: dict, manifest: InstallManifest, relpaths: List[str], mirrors: List[str]):
+	source = manifest.components["java"]["source"]
+	archive = _cached_file(source["archive"], source.get("archive_sha256"))
+	if archive is None:
+		url = JavaUtils.get_java_url(config["java_urls"], source["platform"], source["version"])
+		if not url:
+			raise RuntimeError(f"URL для Java {source['version']} не найден в конфигурации.")
+		print(f"Архив Java {source['version']} не найден в кэше, скачиваем заново.")
+		archive = download_blocking(url, os.path.join(FileUtils.get_download_dir(), source["archive"]),
+									source.get("archive_sha256"), mirrors)
+
+	# Only the damaged members are pulled out of the archive; the rest of the tree is left untouched.
+	wanted = {f"{source['root']}/{relpath.split('/', 1)[1]}": relpath for relpath in relpaths}
+	with tarfile.open(archive, "r:gz") as tar:
+		for member in tar:
+			name = member.name[2:] if member.name.startswith("./") else member.name
+			relpath = wanted.pop(name, None)
+			if relpath is None or not member.isfile():
+				continue
+			destination = os.path.join(manifest.install_path, *relpath.split("/"))
+			os.makedirs(os.path.dirname(destination), exist_ok=True)
+			with tar.extractfile(member) as src, open(destination, "wb") as dst:
+				shutil.copyfileobj(src, dst, 1024 * 1024)
+			os.chmod(destination, member.mode)
+			if not wanted:
+				break
+
+	if wanted:
+		raise RuntimeError(f"В архиве Java нет файлов: {', '.join(sorted(wanted.values()))}")
+
+
+def _repair_plugins(config: dict, manifest: InstallManifest, mirrors: List[str]):
+	# The lock file pins every plugin by digest, so the cache (or a re-download) restores the exact same jars.
+	installer = PluginInstaller(config, manifest.install_path, mirrors)
+	resolved = installer.resolve(installer.locked_entries())
+	installer.fetch(resolved)
+	installer.link(resolved)
+
+
+def _repair_service_files(config: dict, manifest: InstallManifest, relpaths: List[str]):
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		ServiceFiles.write(config, tmp_dir, JavaUtils.get_platform_key() == "windows")
+		for relpath in relpaths:
+			shutil.copy2(os.path.join(tmp_dir, os.path.basename(relpath)),
+						 os.path.join(manifest.install_path, *relpath.split("/")))
+
+
+def _split_modified(damaged: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+	modified = sorted(relpath for relpath, problem in damaged.items() if problem == "modified")
+	return {relpath: problem for relpath, problem in damaged.items() if problem != "modified"}, modified
+
+
+def verify_install(install_path: str, full: bool = False, jobs: Optional[int] = None) -> int:
+	manifest = InstallManifest(install_path)
+	if not manifest.exists():
+		print(f"Манифест установки не найден в {install_path}.")
+		return 1
+
+	damaged, modified = _split_modified(manifest.verify(full=full, jobs=jobs))
+	for relpath in modified:
+		print(f"  {relpath}: {PROBLEMS['modified']}")
+	for relpath, problem in sorted(damaged.items()):
+		print(f"  {relpath}: {PROBLEMS[problem]}")
+
+	if damaged:
+		print(f"Повреждено файлов: {len(damaged)} из {len(manifest.files)}. Запустите repair для восстановления.")
+		return 1
+	print(f"Установка цела: проверено файлов {len(manifest.files)}, изменено вручную {len(modified)}.")
+	return 0
+
+
+def repair_install(config: dict, install_path: str, full: bool = False, force: bool = False,
+				   jobs: Optional[int] = None, mirrors: Optional[List[str]] = None) -> int:
+	manifest = InstallManifest(install_path)
+	if not manifest.exists():
+		print(f"Манифест установки не найден в {install_path}.")
+		return 1
+
+	damaged, modified = _split_modified(manifest.verify(full=full, jobs=jobs))
+	if force:
+		damaged.update({relpath: "modified" for relpath in modified})
+	else:
+		for relpath in modified:
+			print(f"  {relpath}: изменён вручную, оставляем (--force чтобы перезаписать)")
+	if not damaged:
+		print(f"Установка цела: проверено файлов {len(manifest.files)}.")
+		return 0
+
+	mirrors = mirrors or []
+	unresolved = []
+	for component, relpaths in manifest.damaged_components(damaged).items():
+		print(f"Восстанавливаем {component}: файлов {len(relpaths)}")
+		logging.info(f"Восстановление {component}: {len(relpaths)} файлов", extra={"phase": "repair", "task": component})
+		try:
+			if component == "scripts":
+				# Regenerated scripts reflect today's hardware profile, so the new digests are recorded instead.
+				_repair_service_files(config, manifest, relpaths)
+				manifest.accept(relpaths)
+				continue
+			if component == "supervisor":
+				_repair_service_files(config, manifest, relpaths)
+			elif component == "core":
+				_repair_core(manifest, relpaths, mirrors)
+			elif component == "java":
+				_repair_java(config, manifest, relpaths, mirrors)
+			elif component == "plugins":
+				_repair_plugins(config, manifest, mirrors)
+			else:
+				raise RuntimeError(f"неизвестный компонент {component}")
+			unresolved += manifest.confirm(relpaths)
+		except Exception as e:
+			logging.error(f"Ошибка восстановления {component}: {e}", extra={"phase": "repair", "task": component})
+			print(f"  Не удалось восстановить {component}: {e}")
+			unresolved += relpaths
+
+	if unresolved:
+		print(f"Не восстановлено файлов: {len(unresolved)}.")
+		return 1
+	print(f"Восстановлено файлов: {len(damaged)}.")
+	return 0
@@ -0,0 +1,110 @@
+import json
+from typing import Dict
+
+
+class ServerConfig:
+	DEFAULT_PLAYERS = 20
+
+	@staticmethod
+	def tune(profile: Dict, players: int) -> Dict[str, Dict]:
+		cpu_count = profile["cpu_count"]
+		heap_gb = profile["heap_gb"]
+		small = cpu_count <= 2 or heap_gb <= 2
+		large = cpu_count >= 8 and heap_gb >= 8
+
+		if small:
+			view_distance = 6
+		elif large:
+			view_distance = 10
+		else:
+			view_distance = 8
+		# Every player keeps a square of view_distance chunks loaded; trim it when the host is crowded.
+		if players > cpu_count * 10:
+			view_distance = max(4, view_distance - 2)
+
+		return {
+			"server.properties": {
+				"max-players": players,
+				"view-distance": view_distance,
+				"auto-save": "on"
+			},
+			"nukkit.yml": {
+				"settings": {
+					"async-workers": max(1, min(8, cpu_count - 1))
+				},
+				"network": {
+					"batch-threshold": 512 if small else 256,
+					"compression-level": 4 if small else (7 if large else 6),
+					"async-compression": cpu_count > 2
+				},
+				"chunk-sending": {
+					"per-tick": 4 if small else (8 if large else 6),
+					"max-chunks": 64 if small else (192 if large else 128),
+					"spawn-threshold": 56
+				},
+				"chunk-ticking": {
+					"tick-radius": min(view_distance - 1, 2 if small else (4 if large else 3))
+				},
+				"ticks-per": {
+					"autosave": 12000 if small else 6000
+				}
+			}
+		}
+
+	@staticmethod
+	def merge(base: Dict, overrides: Dict) -> Dict:
+		merged = dict(base)
+		for key, value in overrides.items():
+			if isinstance(value, dict) and isinstance(merged.get(key), dict):
+				merged[key] = ServerConfig.merge(merged[key], value)
+			else:
+				merged[key] = value
+		return merged
+
+	@staticmethod
+	def build(profile: Dict, installer_config: Dict) -> Dict[str, Dict]:
+		server_config = installer_config.get("server_config", {})
+		players = server_config.get("expected_players", ServerConfig.DEFAULT_PLAYERS)
+		return ServerConfig.merge(ServerConfig.tune(profile, players), server_config.get("overrides", {}))
+
+	@staticmethod
+	def _format_value(value) -> str:
+		if isinstance(value, bool):
+			return "true" if value else "false"
+		return str(value)
+
+	@staticmethod
+	def _format_yaml_value(value) -> str:
+		if value is None:
+			return "null"
+		if isinstance(value, (bool, int, float)):
+			return ServerConfig._format_value(value)
+		# A JSON string or list is also a valid YAML flow scalar, so quoting and escaping come for free.
+		return json.dumps(value, ensure_ascii=False)
+
+	@staticmethod
+	def render_properties(values: Dict) -> str:
+		lines = ["#Properties Config file", "#Generated by Lumi Server Installer"]
+		lines += [f"{key}={ServerConfig._format_value(value)}" for key, value in values.items()]
+		return "\n".join(lines) + "\n"
+
+	@staticmethod
+	def render_yaml(values: Dict, indent: int = 0) -> str:
+		lines = []
+		for key, value in values.items():
+			if isinstance(value, dict) and value:
+				lines.append(f"{'  ' * indent}{key}:")
+				lines.append(ServerConfig.render_yaml(value, indent + 1).rstrip("\n"))
+			elif isinstance(value, dict):
+				lines.append(f"{'  ' * indent}{key}: {{}}")
+			else:
+				lines.append(f"{'  ' * indent}{key}: {ServerConfig._format_yaml_value(value)}")
+		return "\n".join(lines) + "\n"
+
+	@staticmethod
+	def render(profile: Dict, installer_config: Dict) -> Dict[str, str]:
+		values = ServerConfig.build(profile, installer_config)
+		return {
+			"server.properties": ServerConfig.render_properties(values["server.properties"]),
+			"nukkit.yml": "# Generated by Lumi Server Installer\n" + ServerConfig.render_yaml(values["nukkit.yml"])
+		}
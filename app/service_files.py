@@ -0,0 +1,65 @@
+import json
+import os
+import stat
+from typing import Dict, List, Optional
+
+from app.server_config import ServerConfig
+from main import FileUtils, get_resource_path
+from utils.hardware_utils import HardwareUtils
+
+
+class ServiceFiles:
+	@staticmethod
+	def get_profile(config: dict) -> Dict:
+		profile = HardwareUtils.detect()
+		memory_gb = config.get("server_config", {}).get("memory_gb")
+		if memory_gb:
+			profile["heap_gb"] = memory_gb
+		return profile
+
+	@staticmethod
+	def render_start_script(config: dict, is_windows: bool, profile: Dict) -> str:
+		template = get_resource_path('resources/server_files/start.cmd' if is_windows else 'resources/server_files/start.sh')
+		with open(template, 'r', encoding='utf-8') as f:
+			return (
+				f.read()
+				.replace('{MEMORY}', str(profile['heap_gb']))
+				.replace('{CORE_NAME}', config['server_jar_name'])
+			)
+
+	@staticmethod
+	def write(config: dict, install_path: str, is_windows: bool, profile: Optional[Dict] = None) -> List[str]:
+		profile = profile or ServiceFiles.get_profile(config)
+		dst = os.path.join(install_path, 'start.cmd' if is_windows else 'start.sh')
+		if not FileUtils.write_text_file(dst, ServiceFiles.render_start_script(config, is_windows, profile)):
+			raise OSError(f"Не удалось записать {dst}")
+
+		if not is_windows:
+			st = os.stat(dst)
+			os.chmod(dst, st.st_mode | stat.S_IEXEC)
+
+		supervisor_path = os.path.join(install_path, 'supervisor.py')
+		if not FileUtils.copy_resource_file('resources/server_files/supervisor.py', supervisor_path):
+			raise OSError(f"Не удалось скопировать {supervisor_path}")
+
+		supervisor_config = {"memory_gb": profile['heap_gb'], "core_name": config['server_jar_name']}
+		supervisor_config.update(config.get("supervisor", {}))
+		supervisor_config_path = os.path.join(install_path, 'supervisor.json')
+		if not FileUtils.write_text_file(supervisor_config_path, json.dumps(supervisor_config, ensure_ascii=False, indent="\t")):
+			raise OSError(f"Не удалось записать {supervisor_config_path}")
+
+		return [dst, supervisor_path, supervisor_config_path]
+
+	@staticmethod
+	def write_server_config(config: dict, install_path: str, profile: Optional[Dict] = None) -> List[str]:
+		profile = profile or ServiceFiles.get_profile(config)
+		written = []
+		# Only seeded on first install: afterwards the files belong to the server and its owner.
+		for name, content in ServerConfig.render(profile, config).items():
+			path = os.path.join(install_path, name)
+			if os.path.exists(path):
+				continue
+			if not FileUtils.write_text_file(path, content):
+				raise OSError(f"Не удалось записать {path}")
+			written.append(path)
+		return written
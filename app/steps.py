@@ -90,6 +90,14 @@ class Steps:
 		installer.file_status_label = ctk.CTkLabel(parent, text="Создаем служебные файлы...", font=ctk.CTkFont(size=18))
 		installer.file_status_label.pack(expand=True)
 
+	@staticmethod
+	def create_plugin_install_step(installer: "InstallerApp", parent):
+		installer.plugin_status_label = ctk.CTkLabel(parent, text="Устанавливаем плагины...", font=installer.FONT_BODY)
+		installer.plugin_status_label.pack(pady=(150, 10), padx=installer.PADDING_X)
+		installer.plugin_progress = ctk.CTkProgressBar(parent)
+		installer.plugin_progress.set(0)
+		installer.plugin_progress.pack(pady=installer.PADDING_Y, padx=40, fill="x")
+
 	@staticmethod
 	def create_final_step(installer: "InstallerApp", parent):
 		congrats_label = ctk.CTkLabel(parent, text="Поздравляем! 🎉", font=installer.FONT_TITLE)
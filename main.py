@@ -6,6 +6,7 @@ try:
 	from utils.java_utils import JavaUtils
 	from utils.github_api import GitHubAPI
 	from utils.file_utils import FileUtils
+	from utils.log_utils import LogUtils
 except ImportError:
 	logging.error("FATAL ERROR: Utility files (java_utils.py, github_api.py, file_utils.py) not found in the 'utils' directory.")
 	logging.error("Please create them before running the application.")
@@ -24,9 +25,13 @@ except ImportError:
 		def copy_resource_file(src, dst): pass
 		@staticmethod
 		def write_text_file(path, content): pass
+	class LogUtils:
+		@staticmethod
+		def setup_logging():
+			logging.basicConfig(filename="installer.log", level=logging.INFO, encoding="utf-8",
+								format="%(asctime)s - %(levelname)s - %(message)s")
 
-logging.basicConfig(filename="installer.log", level=logging.INFO, encoding="utf-8",
-					format="%(asctime)s - %(levelname)s - %(message)s")
+LogUtils.setup_logging()
 
 def get_resource_path(relative_path):
 	try:
@@ -36,7 +41,6 @@ def get_resource_path(relative_path):
 	return os.path.join(base_path, relative_path)
 
 if __name__ == "__main__":
-	from app.installer import InstallerApp
+	from app.cli import run_cli
 
-	app = InstallerApp()
-	app.mainloop()
\ No newline at end of file
+	sys.exit(run_cli(sys.argv[1:]))
\ No newline at end of file
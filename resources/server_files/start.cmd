@@ -1,6 +1,9 @@
 @echo off
 chcp 65001 >nul
 
+:: Если есть Python, сервер запускается через supervisor.py, и все настройки (память, Java, аргументы JVM,
+:: задержки перезапуска) берутся из supervisor.json. Переменные ниже действуют только без Python.
+
 :: Сколько гигабайт ОЗУ выделить серверу
 set MEMORY={MEMORY}
 
@@ -11,6 +14,15 @@ set RESTART_DELAY=5
 set CORE_NAME={CORE_NAME}
 
 title Minecraft Lumi Server
+
+:: supervisor.py: перезапуск с нарастающей задержкой, защита от бесконечных падений
+:: и журнал запусков в logs\supervisor.jsonl
+python -c "" >nul 2>nul
+if %errorlevel%==0 if exist "%~dp0supervisor.py" (
+	python "%~dp0supervisor.py"
+	goto :eof
+)
+
 echo Запуск сервера...
 echo.
 
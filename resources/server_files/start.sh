@@ -1,4 +1,7 @@
 #!/bin/bash
+# Если есть Python, сервер запускается через supervisor.py, и все настройки (память, Java, аргументы JVM,
+# задержки перезапуска) берутся из supervisor.json. Переменные ниже действуют только без Python.
+
 # Сколько гигабайт ОЗУ выделить серверу
 MEMORY={MEMORY}
 
@@ -13,6 +16,13 @@ if [ ! -x "$JAVA_BIN" ]; then
 	JAVA_BIN="java"
 fi
 
+# supervisor.py: перезапуск с нарастающей задержкой, защита от бесконечных падений
+# и журнал запусков в logs/supervisor.jsonl
+PYTHON_BIN="$(command -v python3 || command -v python)"
+if [ -n "$PYTHON_BIN" ] && [ -f "$SCRIPT_DIR/supervisor.py" ]; then
+	exec "$PYTHON_BIN" "$SCRIPT_DIR/supervisor.py"
+fi
+
 echo "Запуск сервера..."
 echo
 
@@ -0,0 +1,260 @@
+import json
+import os
+import platform
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+IS_WINDOWS = platform.system() == "Windows"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_NAME = "supervisor.json"
+
+DEFAULT_CONFIG = {
+	"java": None,
+	"memory_gb": 4,
+	"core_name": "Lumi.jar",
+	"jvm_args": [],
+	"server_args": ["nogui"],
+	"ready_pattern": r"Done \(",
+	"stop_command": "stop",
+	"stop_timeout": 60,
+	"restart_on_clean_exit": True,
+	"backoff_initial": 5,
+	"backoff_multiplier": 2,
+	"backoff_max": 300,
+	"stable_uptime": 300,
+	"crash_loop_max": 5,
+	"crash_loop_window": 600,
+	"rss_interval": 10,
+	"metrics_log": "logs/supervisor.jsonl"
+}
+
+
+def load_config(path):
+	config = dict(DEFAULT_CONFIG)
+	if os.path.exists(path):
+		with open(path, "r", encoding="utf-8") as f:
+			config.update(json.load(f))
+	return config
+
+
+def find_java(config):
+	if config.get("java"):
+		return config["java"]
+	local_java = os.path.join(SCRIPT_DIR, "java", "bin", "java.exe" if IS_WINDOWS else "java")
+	if os.path.isfile(local_java) and os.access(local_java, os.X_OK):
+		return local_java
+	return "java"
+
+
+def read_rss(pid):
+	try:
+		import psutil
+		return psutil.Process(pid).memory_info().rss
+	except ImportError:
+		pass
+	except Exception:
+		return None
+
+	try:
+		with open(f"/proc/{pid}/status", "r") as f:
+			for line in f:
+				if line.startswith("VmRSS:"):
+					return int(line.split()[1]) * 1024
+	except (OSError, ValueError, IndexError):
+		pass
+	return None
+
+
+class MetricsLog:
+	def __init__(self, path):
+		self.path = path
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		self._lock = threading.Lock()
+
+	def write(self, event, **fields):
+		record = {"ts": round(time.time(), 3), "event": event}
+		record.update(fields)
+		with self._lock, open(self.path, "a", encoding="utf-8") as f:
+			f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class Supervisor:
+	def __init__(self, config, command=None):
+		self.config = config
+		self.command = command or self.build_command()
+		self.ready_re = re.compile(config["ready_pattern"])
+		self.metrics = MetricsLog(os.path.join(SCRIPT_DIR, config["metrics_log"]))
+		self.process = None
+		self.stopping = threading.Event()
+		self.restarts = 0
+		self.crash_times = deque()
+
+	def build_command(self):
+		memory = f"{self.config['memory_gb']}G"
+		return (
+			[find_java(self.config), f"-Xmx{memory}", f"-Xms{memory}"]
+			+ list(self.config["jvm_args"])
+			+ ["-jar", os.path.join(SCRIPT_DIR, self.config["core_name"])]
+			+ list(self.config["server_args"])
+		)
+
+	def request_stop(self, signum=None, frame=None):
+		if self.stopping.is_set():
+			return
+		self.stopping.set()
+		print("\nОстанавливаем сервер...", flush=True)
+		threading.Thread(target=self._stop_process, daemon=True).start()
+
+	def _stop_process(self):
+		process = self.process
+		if process is None or process.poll() is not None:
+			return
+		try:
+			process.stdin.write((self.config["stop_command"] + "\n").encode("utf-8"))
+			process.stdin.flush()
+		except (OSError, ValueError):
+			pass
+		try:
+			process.wait(self.config["stop_timeout"])
+			return
+		except subprocess.TimeoutExpired:
+			pass
+		process.terminate()
+		try:
+			process.wait(10)
+		except subprocess.TimeoutExpired:
+			process.kill()
+
+	def _forward_stdin(self):
+		for line in sys.stdin:
+			process = self.process
+			if process is None or process.poll() is not None:
+				continue
+			try:
+				process.stdin.write(line.encode("utf-8"))
+				process.stdin.flush()
+			except (OSError, ValueError):
+				pass
+
+	def _sample_rss(self, process, stats, done):
+		while not done.wait(self.config["rss_interval"]):
+			rss = read_rss(process.pid)
+			if rss is not None:
+				stats["peak_rss"] = max(stats.get("peak_rss") or 0, rss)
+				stats["rss"] = rss
+
+	def run_once(self, run):
+		started = time.monotonic()
+		# The server gets its own process group so Ctrl+C reaches only the supervisor, which then stops it gracefully.
+		self.process = subprocess.Popen(
+			self.command,
+			cwd=SCRIPT_DIR,
+			stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE,
+			stderr=subprocess.STDOUT,
+			creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if IS_WINDOWS else 0,
+			start_new_session=not IS_WINDOWS
+		)
+		self.metrics.write("start", run=run, pid=self.process.pid, restarts=self.restarts, command=self.command)
+
+		stats = {"peak_rss": None, "rss": None}
+		done = threading.Event()
+		threading.Thread(target=self._sample_rss, args=(self.process, stats, done), daemon=True).start()
+
+		ready_time = None
+		for raw_line in self.process.stdout:
+			line = raw_line.decode("utf-8", errors="replace")
+			sys.stdout.write(line)
+			sys.stdout.flush()
+			if ready_time is None and self.ready_re.search(line):
+				ready_time = time.monotonic() - started
+				rss = read_rss(self.process.pid)
+				self.metrics.write("ready", run=run, pid=self.process.pid, time_to_ready=round(ready_time, 3), rss=rss)
+
+		exit_code = self.process.wait()
+		done.set()
+		uptime = time.monotonic() - started
+		self.metrics.write(
+			"exit", run=run, pid=self.process.pid, exit_code=exit_code, uptime=round(uptime, 3),
+			time_to_ready=round(ready_time, 3) if ready_time is not None else None,
+			peak_rss=stats["peak_rss"], restarts=self.restarts, stopping=self.stopping.is_set()
+		)
+		return exit_code, uptime, ready_time
+
+	def run(self):
+		signal.signal(signal.SIGINT, self.request_stop)
+		signal.signal(signal.SIGTERM, self.request_stop)
+		if hasattr(signal, "SIGBREAK"):
+			signal.signal(signal.SIGBREAK, self.request_stop)
+		threading.Thread(target=self._forward_stdin, daemon=True).start()
+
+		delay = self.config["backoff_initial"]
+		run = 0
+		print("Запуск сервера...", flush=True)
+
+		while not self.stopping.is_set():
+			run += 1
+			try:
+				exit_code, uptime, ready_time = self.run_once(run)
+			except OSError as e:
+				self.metrics.write("spawn_error", run=run, error=str(e))
+				print(f"Не удалось запустить сервер: {e}", flush=True)
+				return 1
+
+			if self.stopping.is_set():
+				break
+			if exit_code == 0 and not self.config["restart_on_clean_exit"]:
+				print("Сервер остановлен.", flush=True)
+				return 0
+
+			now = time.monotonic()
+			if uptime >= self.config["stable_uptime"]:
+				delay = self.config["backoff_initial"]
+				self.crash_times.clear()
+			if exit_code != 0:
+				self.crash_times.append(now)
+			while self.crash_times and now - self.crash_times[0] > self.config["crash_loop_window"]:
+				self.crash_times.popleft()
+
+			if len(self.crash_times) >= self.config["crash_loop_max"]:
+				self.metrics.write("crash_loop", run=run, crashes=len(self.crash_times),
+								   window=self.config["crash_loop_window"])
+				print(
+					f"Сервер упал {len(self.crash_times)} раз за {self.config['crash_loop_window']} секунд. "
+					"Перезапуски остановлены, проверьте логи.", flush=True
+				)
+				return 2
+
+			self.restarts += 1
+			print(f"\nСервер остановлен (код {exit_code}). Перезапуск через {delay} секунд...", flush=True)
+			self.metrics.write("restart", run=run, delay=delay, restarts=self.restarts)
+			if self.stopping.wait(delay):
+				break
+			delay = min(delay * self.config["backoff_multiplier"], self.config["backoff_max"])
+
+		print("Сервер остановлен.", flush=True)
+		return 0
+
+
+def main(argv):
+	config_path = os.path.join(SCRIPT_DIR, CONFIG_NAME)
+	command = None
+	if "--" in argv:
+		command = argv[argv.index("--") + 1:]
+		argv = argv[:argv.index("--")]
+	if "--config" in argv:
+		config_path = argv[argv.index("--config") + 1]
+
+	config = load_config(config_path)
+	if "--restart-delay" in argv:
+		config["backoff_initial"] = float(argv[argv.index("--restart-delay") + 1])
+	return Supervisor(config, command).run()
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
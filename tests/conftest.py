@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+	def log_message(self, format, *args):
+		pass
+
+	def do_GET(self):
+		server = self.server
+		server.requests.append((self.command, self.path, self.headers.get("Range")))
+		path = os.path.join(server.directory, unquote(self.path.lstrip("/").split("?", 1)[0]))
+		if not os.path.isfile(path):
+			self.send_error(404)
+			return
+
+		with open(path, "rb") as f:
+			data = f.read()
+		start = 0
+		range_header = self.headers.get("Range")
+		if range_header and range_header.startswith("bytes=") and server.ranges:
+			start = int(range_header[len("bytes="):].split("-", 1)[0] or 0)
+
+		self.send_response(206 if start else 200)
+		self.send_header("Content-Length", str(len(data) - start))
+		if start:
+			self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+		self.end_headers()
+		try:
+			for offset in range(start, len(data), server.chunk_size):
+				self.wfile.write(data[offset:offset + server.chunk_size])
+				self.wfile.flush()
+				if server.chunk_delay:
+					time.sleep(server.chunk_delay)
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+
+@pytest.fixture
+def app_home(tmp_path, monkeypatch):
+	home = tmp_path / "home"
+	home.mkdir()
+	monkeypatch.setenv("HOME", str(home))
+	monkeypatch.setenv("USERPROFILE", str(home))
+	return home
+
+
+@pytest.fixture
+def file_server(tmp_path):
+	"""Serves tmp_path/served over HTTP with Range support and records every request."""
+	directory = tmp_path / "served"
+	directory.mkdir()
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+	server.daemon_threads = True
+	server.directory = str(directory)
+	server.requests = []
+	server.ranges = True
+	server.chunk_size = 64 * 1024
+	server.chunk_delay = 0
+	server.url = f"http://127.0.0.1:{server.server_address[1]}"
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	yield server
+	server.shutdown()
+	server.server_close()
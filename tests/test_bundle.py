@@ -0,0 +1,84 @@
+import json
+import zipfile
+
+import pytest
+
+from utils.bundle_utils import BundleError, BundleWriter, OfflineBundle
+
+CORE_INFO = {"version": "1.0.0", "asset_name": "Lumi-1.0.0.jar", "download_url": "https://example.com/Lumi-1.0.0.jar"}
+
+
+@pytest.fixture(autouse=True)
+def no_env_key(monkeypatch):
+	monkeypatch.delenv("LUMI_BUNDLE_KEY", raising=False)
+
+
+def write_bundle(tmp_path, key=None):
+	core = tmp_path / "Lumi-1.0.0.jar"
+	core.write_bytes(b"core" * 1000)
+	java = tmp_path / "jdk.tar.gz"
+	java.write_bytes(b"java" * 2000)
+
+	writer = BundleWriter(str(tmp_path / "bundle.zip"), key=key)
+	writer.add_core(str(core), CORE_INFO)
+	writer.add_java(str(java), "linux-x64", "21", "https://example.com/jdk.tar.gz")
+	writer.write()
+	return tmp_path / "bundle.zip"
+
+
+def rewrite_member(bundle_path, arcname, transform):
+	with zipfile.ZipFile(bundle_path) as zf:
+		members = {name: zf.read(name) for name in zf.namelist()}
+	members[arcname] = transform(members[arcname])
+	with zipfile.ZipFile(bundle_path, "w", compression=zipfile.ZIP_STORED) as zf:
+		for name, data in members.items():
+			zf.writestr(name, data)
+
+
+def test_untouched_bundle_verifies_and_extracts(tmp_path):
+	bundle = OfflineBundle(str(write_bundle(tmp_path))).open()
+	bundle.verify()
+
+	assert bundle.get_release()["version"] == "1.0.0"
+	assert bundle.get_java_versions("linux-x64") == ["21"]
+	destination = bundle.extract(bundle.get_java_path("linux-x64", "21"), str(tmp_path / "out" / "jdk.tar.gz"))
+	assert open(destination, "rb").read() == b"java" * 2000
+
+
+def test_tampered_member_is_rejected(tmp_path):
+	bundle_path = write_bundle(tmp_path)
+	rewrite_member(bundle_path, "core/Lumi-1.0.0.jar", lambda data: b"evil" + data[4:])
+	bundle = OfflineBundle(str(bundle_path)).open()
+
+	with pytest.raises(BundleError):
+		bundle.verify()
+	with pytest.raises(BundleError):
+		bundle.extract("core/Lumi-1.0.0.jar", str(tmp_path / "Lumi.jar"))
+	assert not (tmp_path / "Lumi.jar").exists()
+
+
+def test_tampered_manifest_is_rejected(tmp_path):
+	bundle_path = write_bundle(tmp_path)
+
+	def swap_digest(data):
+		manifest = json.loads(data)
+		manifest["files"]["core/Lumi-1.0.0.jar"]["sha256"] = "0" * 64
+		return json.dumps(manifest).encode("utf-8")
+
+	rewrite_member(bundle_path, "manifest.json", swap_digest)
+	with pytest.raises(BundleError):
+		OfflineBundle(str(bundle_path)).open()
+
+
+def test_signed_bundle_requires_matching_key(tmp_path):
+	signed_path = write_bundle(tmp_path, key="secret")
+	OfflineBundle(str(signed_path), key="secret").open().verify()
+
+	with pytest.raises(BundleError):
+		OfflineBundle(str(signed_path), key="wrong").open()
+
+
+def test_unsigned_bundle_rejected_when_key_set(tmp_path):
+	unsigned_path = write_bundle(tmp_path)
+	with pytest.raises(BundleError):
+		OfflineBundle(str(unsigned_path), key="secret").open()
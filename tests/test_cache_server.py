@@ -0,0 +1,110 @@
+import hashlib
+import http.client
+import logging
+import queue
+
+import pytest
+
+from app.download_manager import get_download_manager
+from utils.cache_server import DIGEST_HEADER, CacheServer
+
+PAYLOAD = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def cache_server(tmp_path):
+	cache_dir = tmp_path / "cache"
+	cache_dir.mkdir()
+	(cache_dir / "Lumi.jar").write_bytes(PAYLOAD)
+	(cache_dir / "Partial.jar.part").write_bytes(b"partial")
+	(cache_dir / ".hidden").write_bytes(b"hidden")
+	(tmp_path / "secret.txt").write_bytes(b"secret")
+	server = CacheServer(str(cache_dir), host="127.0.0.1", port=0, discovery_port=None).start()
+	yield server
+	server.stop()
+
+
+def request(server, path, headers=None, method="GET"):
+	connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+	try:
+		connection.request(method, path, headers=headers or {})
+		response = connection.getresponse()
+		return response.status, dict(response.getheaders()), response.read()
+	finally:
+		connection.close()
+
+
+def test_full_get_reports_digest(cache_server):
+	status, headers, body = request(cache_server, "/files/Lumi.jar")
+	assert status == 200
+	assert body == PAYLOAD
+	assert headers[DIGEST_HEADER] == hashlib.sha256(PAYLOAD).hexdigest()
+
+
+@pytest.mark.parametrize("range_header, expected", [
+	("bytes=100-199", PAYLOAD[100:200]),
+	("bytes=16000-", PAYLOAD[16000:]),
+	("bytes=-10", PAYLOAD[-10:])
+])
+def test_range_request(cache_server, range_header, expected):
+	status, headers, body = request(cache_server, "/files/Lumi.jar", {"Range": range_header})
+	assert status == 206
+	assert body == expected
+	assert headers["Content-Range"].endswith(f"/{len(PAYLOAD)}")
+
+
+@pytest.mark.parametrize("range_header", [f"bytes={len(PAYLOAD)}-", "bytes=200-100", "bytes=-", "items=0-1"])
+def test_bad_range_is_416(cache_server, range_header):
+	status, headers, _ = request(cache_server, "/files/Lumi.jar", {"Range": range_header})
+	assert status == 416
+	assert headers["Content-Range"] == f"bytes */{len(PAYLOAD)}"
+
+
+@pytest.mark.parametrize("path", [
+	"/files/Partial.jar.part",
+	"/files/.hidden",
+	"/files/../secret.txt",
+	"/files/%2e%2e%2fsecret.txt",
+	"/files/missing.jar",
+	"/Lumi.jar"
+])
+def test_hidden_and_traversal_paths_are_404(cache_server, path):
+	assert request(cache_server, path)[0] == 404
+
+
+def download(tmp_path, url, expected_sha256, mirrors):
+	download_queue = queue.Queue()
+	save_path = tmp_path / "downloads" / "Lumi.jar"
+	save_path.parent.mkdir(exist_ok=True)
+	handle = get_download_manager().submit(url, str(save_path), download_queue, expected_sha256=expected_sha256,
+										   mirrors=mirrors)
+	assert handle.wait(30)
+	return save_path, handle
+
+
+def test_download_uses_matching_mirror(tmp_path, cache_server, file_server, caplog):
+	caplog.set_level(logging.INFO)
+	save_path, handle = download(tmp_path, f"{file_server.url}/Lumi.jar", hashlib.sha256(PAYLOAD).hexdigest(),
+								 [f"http://127.0.0.1:{cache_server.port}"])
+
+	assert handle.state == "finished"
+	assert save_path.read_bytes() == PAYLOAD
+	assert file_server.requests == []
+	assert any('"GET /files/Lumi.jar' in record.getMessage() for record in caplog.records)
+
+
+def test_download_falls_back_to_upstream_on_digest_mismatch(tmp_path, cache_server, file_server, caplog):
+	caplog.set_level(logging.INFO)
+	upstream = b"the real release" * 100
+	with open(f"{file_server.directory}/Lumi.jar", "wb") as f:
+		f.write(upstream)
+
+	save_path, handle = download(tmp_path, f"{file_server.url}/Lumi.jar", hashlib.sha256(upstream).hexdigest(),
+								 [f"http://127.0.0.1:{cache_server.port}"])
+
+	assert handle.state == "finished"
+	assert save_path.read_bytes() == upstream
+	assert [request[:2] for request in file_server.requests] == [("GET", "/Lumi.jar")]
+	# The mismatch is caught from the HEAD digest, before any bytes are pulled from the mirror.
+	assert any("не совпадает, пропускаем" in record.getMessage() for record in caplog.records)
+	assert not any('"GET /files/Lumi.jar' in record.getMessage() for record in caplog.records)
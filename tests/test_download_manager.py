@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import os
+import queue
+import time
+
+import pytest
+
+from app.download_manager import DownloadManager, TokenBucket
+
+
+@pytest.fixture
+def manager():
+	manager = DownloadManager(max_concurrent=1)
+	yield manager
+	manager.shutdown()
+
+
+@pytest.fixture
+def slow_server(file_server):
+	file_server.chunk_size = 4 * 1024
+	file_server.chunk_delay = 0.02
+	for name, size in (("blocker.bin", 64 * 1024), ("big.bin", 256 * 1024), ("a.bin", 4 * 1024), ("b.bin", 4 * 1024)):
+		with open(os.path.join(file_server.directory, name), "wb") as f:
+			f.write(os.urandom(size))
+	return file_server
+
+
+def served(server, name):
+	with open(os.path.join(server.directory, name), "rb") as f:
+		return f.read()
+
+
+def requested(server):
+	return [path.lstrip("/") for _, path, _ in server.requests]
+
+
+def wait_for(condition, timeout=10):
+	deadline = time.monotonic() + timeout
+	while not condition():
+		assert time.monotonic() < deadline, "condition not reached in time"
+		time.sleep(0.01)
+
+
+def submit(manager, server, tmp_path, name, **kwargs):
+	return manager.submit(f"{server.url}/{name}", str(tmp_path / name), queue.Queue(), **kwargs)
+
+
+def test_token_bucket_limits_rate():
+	async def scenario():
+		bucket = TokenBucket(rate=100_000, capacity=10_000)
+		started = time.monotonic()
+		await bucket.consume(10_000)
+		burst = time.monotonic() - started
+		await bucket.consume(20_000)
+		await bucket.consume(30_000)
+		# The last oversized request left the bucket in debt; the next caller pays it off.
+		await bucket.consume(1)
+		return burst, time.monotonic() - started
+
+	burst, total = asyncio.run(scenario())
+	assert burst < 0.05
+	# 60 KB at 100 KB/s with a 10 KB burst allowance; oversized requests must not hang.
+	assert 0.45 <= total < 1.0
+
+
+def test_token_bucket_without_limit_never_waits():
+	async def scenario():
+		bucket = TokenBucket(rate=0)
+		started = time.monotonic()
+		await bucket.consume(10 ** 9)
+		return time.monotonic() - started
+
+	assert asyncio.run(scenario()) < 0.05
+
+
+def test_higher_priority_runs_first(manager, slow_server, tmp_path):
+	blocker = submit(manager, slow_server, tmp_path, "blocker.bin")
+	wait_for(lambda: slow_server.requests)
+	low = submit(manager, slow_server, tmp_path, "a.bin", priority=0)
+	high = submit(manager, slow_server, tmp_path, "b.bin", priority=10)
+
+	for handle in (blocker, low, high):
+		assert handle.wait(30)
+	assert requested(slow_server) == ["blocker.bin", "b.bin", "a.bin"]
+
+
+def test_paused_before_start_is_parked(manager, slow_server, tmp_path):
+	blocker = submit(manager, slow_server, tmp_path, "blocker.bin")
+	wait_for(lambda: slow_server.requests)
+	parked = submit(manager, slow_server, tmp_path, "a.bin")
+	parked.pause()
+	other = submit(manager, slow_server, tmp_path, "b.bin")
+
+	assert other.wait(30)
+	# The paused download gave up its slot instead of blocking the queue.
+	assert parked.state == "paused" and not parked.wait(0.2)
+	assert "a.bin" not in requested(slow_server)
+
+	parked.resume()
+	assert parked.wait(30)
+	assert parked.state == "finished"
+	assert requested(slow_server) == ["blocker.bin", "b.bin", "a.bin"]
+	assert (tmp_path / "a.bin").read_bytes() == served(slow_server, "a.bin")
+
+
+def test_pause_and_resume_mid_transfer(manager, slow_server, tmp_path):
+	handle = submit(manager, slow_server, tmp_path, "big.bin")
+	wait_for(lambda: handle.downloaded > 0)
+	handle.pause()
+	wait_for(lambda: handle.state == "paused")
+	paused_at = handle.downloaded
+	time.sleep(0.3)
+
+	assert handle.downloaded == paused_at
+	handle.resume()
+	assert handle.wait(30)
+	assert handle.state == "finished"
+	assert (tmp_path / "big.bin").read_bytes() == served(slow_server, "big.bin")
+
+
+def test_cancel_keeps_part_and_next_run_resumes_with_range(manager, slow_server, tmp_path):
+	expected = served(slow_server, "big.bin")
+	handle = submit(manager, slow_server, tmp_path, "big.bin")
+	wait_for(lambda: handle.downloaded > 0)
+	handle.cancel(discard=False)
+	assert handle.wait(10)
+
+	part = tmp_path / "big.bin.part"
+	assert handle.state == "cancelled"
+	assert part.exists() and 0 < part.stat().st_size < len(expected)
+	offset = part.stat().st_size
+
+	resumed = submit(manager, slow_server, tmp_path, "big.bin", expected_sha256=hashlib.sha256(expected).hexdigest())
+	assert resumed.wait(30)
+	assert resumed.state == "finished"
+	assert slow_server.requests[-1][2] == f"bytes={offset}-"
+	assert (tmp_path / "big.bin").read_bytes() == expected
+	assert not part.exists()
+
+
+def test_cancel_discards_part_by_default(manager, slow_server, tmp_path):
+	handle = submit(manager, slow_server, tmp_path, "big.bin")
+	wait_for(lambda: handle.downloaded > 0)
+	handle.cancel()
+	assert handle.wait(10)
+
+	assert handle.state == "cancelled"
+	assert not (tmp_path / "big.bin.part").exists()
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+from app.repair import repair_install, verify_install
+from utils.install_manifest import InstallManifest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUPERVISOR = os.path.join(REPO_DIR, "resources", "server_files", "supervisor.py")
+
+
+def make_install(tmp_path):
+	(tmp_path / "Lumi.jar").write_bytes(b"core")
+	(tmp_path / "start.sh").write_text("#!/bin/bash\nMEMORY=4\n")
+	(tmp_path / "supervisor.json").write_text('{"memory_gb": 4}')
+	shutil.copy(SUPERVISOR, tmp_path / "supervisor.py")
+	manifest = InstallManifest(str(tmp_path))
+	manifest.record("core", [str(tmp_path / "Lumi.jar")], {"version": "1.0.0"})
+	manifest.record("scripts", [str(tmp_path / "start.sh"), str(tmp_path / "supervisor.json")], {"editable": True})
+	manifest.record("supervisor", [str(tmp_path / "supervisor.py")], {})
+	return manifest
+
+
+def test_clean_install_verifies(tmp_path):
+	make_install(tmp_path)
+	assert InstallManifest(str(tmp_path)).verify(full=True) == {}
+	assert verify_install(str(tmp_path)) == 0
+
+
+def test_edited_scripts_are_modified_not_damaged(tmp_path):
+	make_install(tmp_path)
+	with open(tmp_path / "supervisor.json", "a") as f:
+		f.write("\n")
+	(tmp_path / "start.sh").write_text("#!/bin/bash\nMEMORY=8\n")
+
+	assert InstallManifest(str(tmp_path)).verify() == {"start.sh": "modified", "supervisor.json": "modified"}
+	assert verify_install(str(tmp_path)) == 0
+	assert repair_install({}, str(tmp_path)) == 0
+	assert (tmp_path / "start.sh").read_text() == "#!/bin/bash\nMEMORY=8\n"
+
+
+def test_missing_script_and_changed_core_are_damaged(tmp_path):
+	make_install(tmp_path)
+	(tmp_path / "start.sh").unlink()
+	(tmp_path / "Lumi.jar").write_bytes(b"tampered")
+
+	assert InstallManifest(str(tmp_path)).verify() == {"start.sh": "missing", "Lumi.jar": "size"}
+	assert verify_install(str(tmp_path)) == 1
+
+
+def test_changed_supervisor_is_damaged_and_restored(tmp_path, monkeypatch):
+	make_install(tmp_path)
+	script = (tmp_path / "supervisor.py").read_text()
+	(tmp_path / "supervisor.py").write_text(script.replace("def ", "def broken_", 1))
+
+	assert InstallManifest(str(tmp_path)).verify() == {"supervisor.py": "size"}
+	assert verify_install(str(tmp_path)) == 1
+
+	# Resources are resolved relative to the working directory, as in a source checkout.
+	monkeypatch.chdir(REPO_DIR)
+	assert repair_install({"server_jar_name": "Lumi.jar"}, str(tmp_path)) == 0
+	assert (tmp_path / "supervisor.py").read_text() == script
+	assert (tmp_path / "start.sh").read_text() == "#!/bin/bash\nMEMORY=4\n"
+	assert verify_install(str(tmp_path), full=True) == 0
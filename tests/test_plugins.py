@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from app.plugins import LOCK_NAME, PluginError, PluginInstaller, load_plugin_manifest
+
+
+@pytest.fixture
+def plugin_server(app_home, file_server):
+	served = file_server.directory
+	with open(os.path.join(served, "Alpha.jar"), "wb") as f:
+		f.write(b"alpha" * 1000)
+	with open(os.path.join(served, "Beta.jar"), "wb") as f:
+		f.write(b"beta" * 1000)
+	return file_server
+
+
+def read(server, name):
+	with open(os.path.join(server.directory, name), "rb") as f:
+		return f.read()
+
+
+def entries_for(server):
+	return [
+		{"name": "Alpha", "url": f"{server.url}/Alpha.jar", "sha256": hashlib.sha256(read(server, "Alpha.jar")).hexdigest()},
+		{"name": "Beta", "url": f"{server.url}/Beta.jar"}
+	]
+
+
+def test_install_links_plugins_and_writes_lock(tmp_path, plugin_server, capsys):
+	server = plugin_server
+	install_path = tmp_path / "server"
+	install_path.mkdir()
+	entries = entries_for(server)
+	progress = []
+
+	paths = PluginInstaller({}, str(install_path), on_progress=progress.append).install(entries)
+
+	assert sorted(os.path.basename(path) for path in paths) == ["Alpha.jar", "Beta.jar"]
+	assert (install_path / "plugins" / "Beta.jar").read_bytes() == read(server, "Beta.jar")
+	lock = json.loads((install_path / LOCK_NAME).read_text())
+	assert lock["plugins"]["Beta"]["sha256"] == hashlib.sha256(read(server, "Beta.jar")).hexdigest()
+	assert progress[-1]["fraction"] == 1
+	assert {"Плагин Alpha установлен", "Плагин Beta установлен"} <= {msg["text"] for msg in progress}
+	# Reporting goes through logging and on_progress; printing is left to the CLI.
+	assert capsys.readouterr().out == ""
+
+
+def test_reinstall_from_lock_is_network_free(tmp_path, plugin_server):
+	server = plugin_server
+	install_path = tmp_path / "server"
+	install_path.mkdir()
+	entries = entries_for(server)
+	PluginInstaller({}, str(install_path)).install(entries)
+
+	other_path = tmp_path / "other"
+	other_path.mkdir()
+	(install_path / LOCK_NAME).rename(other_path / LOCK_NAME)
+	requests_before = len(server.requests)
+
+	installer = PluginInstaller({}, str(other_path))
+	assert installer.can_install_offline(entries)
+	installer.install(entries)
+
+	assert len(server.requests) == requests_before
+	assert (other_path / "plugins" / "Alpha.jar").exists()
+
+
+def test_offline_needs_lock_and_cache(tmp_path, plugin_server):
+	server = plugin_server
+	install_path = tmp_path / "server"
+	install_path.mkdir()
+	entries = entries_for(server)
+
+	assert not PluginInstaller({}, str(install_path)).can_install_offline(entries)
+	PluginInstaller({}, str(install_path)).install(entries)
+	changed = [dict(entries[0], version="2"), entries[1]]
+	assert not PluginInstaller({}, str(install_path)).can_install_offline(changed)
+
+
+def test_removed_plugin_is_unlinked(tmp_path, plugin_server):
+	server = plugin_server
+	install_path = tmp_path / "server"
+	install_path.mkdir()
+	entries = entries_for(server)
+	PluginInstaller({}, str(install_path)).install(entries)
+	(install_path / "plugins" / "Manual.jar").write_bytes(b"hand placed")
+
+	PluginInstaller({}, str(install_path)).install(entries[:1])
+
+	assert sorted(os.listdir(install_path / "plugins")) == ["Alpha.jar", "Manual.jar"]
+
+
+def test_manifest_validation():
+	with pytest.raises(PluginError):
+		load_plugin_manifest({"plugins": [{"name": "A", "url": "http://x/a.jar", "repo": "o/r"}]})
+	with pytest.raises(PluginError):
+		load_plugin_manifest({"plugins": [{"name": "A", "url": "http://x/a.jar"}, {"name": "A", "repo": "o/r"}]})
@@ -0,0 +1,140 @@
+import pytest
+
+from utils.github_api import GitHubAPI
+from utils.release_catalog import CatalogError, ReleaseCatalog, parse_version
+
+
+def make_catalog(tmp_path, tags):
+	catalog = ReleaseCatalog(GitHubAPI("owner", "repo"), str(tmp_path / "index.json"))
+	catalog.index["releases"] = [
+		{
+			"id": index,
+			"tag": tag,
+			"date": None,
+			"prerelease": False,
+			"assets": [{"name": f"Lumi-{tag}.jar", "size": 1, "url": f"https://example.com/{tag}.jar", "sha256": None}]
+		}
+		for index, tag in enumerate(tags)
+	]
+	return catalog
+
+
+@pytest.mark.parametrize("tag, expected", [
+	("1.2.3", ((1, 2, 3), False)),
+	("v1.2", ((1, 2), False)),
+	("1.2.3-rc1", ((1, 2, 3), True)),
+	("1.2.3+build5", ((1, 2, 3), False)),
+	("1.2.3-beta.1+build5", ((1, 2, 3), True)),
+	("nightly", None)
+])
+def test_parse_version(tag, expected):
+	assert parse_version(tag) == expected
+
+
+@pytest.mark.parametrize("spec, expected", [
+	(">=1.2,<2", "1.9.0"),
+	(">= 1.2, < 2", "1.9.0"),
+	(">= 1.2 < 1.5", "1.2.3+build5"),
+	("^1.0", "1.9.0"),
+	("~1.2", "1.2.3+build5"),
+	("1.2.*", "1.2.3+build5"),
+	("== 2.0.0", "2.0.0")
+])
+def test_resolve_range(tmp_path, spec, expected):
+	catalog = make_catalog(tmp_path, ["2.0.0", "2.0.0-rc1", "1.9.0", "1.2.3+build5", "1.0.0"])
+	assert catalog.resolve(spec)["version"] == expected
+
+
+def test_invalid_spec(tmp_path):
+	with pytest.raises(CatalogError):
+		make_catalog(tmp_path, ["1.0.0"]).resolve(">= banana")
+
+
+class StubGitHubAPI(GitHubAPI):
+	def __init__(self, pages):
+		super().__init__("owner", "repo")
+		self.pages = pages
+		self.calls = []
+
+	def get_releases_page(self, page=1, per_page=100, etag=None):
+		self.calls.append((page, etag))
+		if etag is not None and etag == self.pages.get("etag"):
+			return None, etag
+		return self.pages["releases"][(page - 1) * per_page:page * per_page], self.pages.get("etag")
+
+
+def api_release(release_id, tag, assets=()):
+	return {
+		"id": release_id,
+		"tag_name": tag,
+		"published_at": None,
+		"prerelease": False,
+		"assets": [
+			{"name": name, "size": 1, "browser_download_url": f"https://example.com/{name}", "digest": None}
+			for name in assets
+		]
+	}
+
+
+def test_update_refreshes_assets_uploaded_after_release(tmp_path):
+	api = StubGitHubAPI({"etag": '"v1"', "releases": [
+		api_release(2, "1.1.0"),
+		api_release(1, "1.0.0", ["Lumi-1.0.0.jar"])
+	]})
+	catalog = ReleaseCatalog(api, str(tmp_path / "index.json"))
+	catalog.update()
+	assert catalog.resolve("latest")["version"] == "1.0.0"
+	assert catalog.resolve("1.1.0") is None
+
+	api.pages = {"etag": '"v2"', "releases": [
+		api_release(2, "1.1.0", ["Lumi-1.1.0.jar"]),
+		api_release(1, "1.0.0", ["Lumi-1.0.0.jar"])
+	]}
+	assert catalog.update() == 0
+	assert catalog.resolve("latest")["version"] == "1.1.0"
+	assert catalog.resolve("1.1.0")["asset_name"] == "Lumi-1.1.0.jar"
+
+	reloaded = ReleaseCatalog(api, str(tmp_path / "index.json"))
+	assert reloaded.resolve("latest")["version"] == "1.1.0"
+
+
+def test_update_drops_releases_deleted_upstream(tmp_path):
+	api = StubGitHubAPI({"etag": '"v1"', "releases": [
+		api_release(3, "1.2.0", ["Lumi-1.2.0.jar"]),
+		api_release(2, "1.1.0", ["Lumi-1.1.0.jar"]),
+		api_release(1, "1.0.0", ["Lumi-1.0.0.jar"])
+	]})
+	catalog = ReleaseCatalog(api, str(tmp_path / "index.json"))
+	catalog.update()
+
+	api.pages = {"etag": '"v2"', "releases": [
+		api_release(4, "1.3.0", ["Lumi-1.3.0.jar"]),
+		api_release(2, "1.1.0", ["Lumi-1.1.0.jar"]),
+		api_release(1, "1.0.0", ["Lumi-1.0.0.jar"])
+	]}
+	assert catalog.update() == 1
+	assert [release["tag"] for release in catalog.releases] == ["1.3.0", "1.1.0", "1.0.0"]
+
+
+def test_update_not_modified_keeps_index(tmp_path):
+	api = StubGitHubAPI({"etag": '"v1"', "releases": [api_release(1, "1.0.0", ["Lumi-1.0.0.jar"])]})
+	catalog = ReleaseCatalog(api, str(tmp_path / "index.json"))
+	catalog.update()
+
+	assert catalog.update() == 0
+	assert api.calls[-1] == (1, '"v1"')
+	assert catalog.resolve("latest")["version"] == "1.0.0"
+
+
+def test_update_stops_paging_at_known_release(tmp_path, monkeypatch):
+	monkeypatch.setattr("utils.release_catalog.PAGE_SIZE", 2)
+	old = [api_release(i, f"1.0.{i}", [f"Lumi-1.0.{i}.jar"]) for i in range(5, 0, -1)]
+	api = StubGitHubAPI({"etag": '"v1"', "releases": old})
+	catalog = ReleaseCatalog(api, str(tmp_path / "index.json"))
+	catalog.update()
+
+	api.pages = {"etag": '"v2"', "releases": [api_release(6, "1.0.6", ["Lumi-1.0.6.jar"])] + old}
+	api.calls.clear()
+	assert catalog.update() == 1
+	assert [page for page, _ in api.calls] == [1]
+	assert [release["tag"] for release in catalog.releases] == [f"1.0.{i}" for i in range(6, 0, -1)]
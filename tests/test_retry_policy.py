@@ -0,0 +1,72 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from utils.retry_policy import CircuitBreaker, RetryPolicy
+
+
+@pytest.mark.parametrize("headers, expected", [
+	({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"}, True),
+	({"X-RateLimit-Remaining": "42"}, False),
+	({}, False)
+])
+def test_403_is_retried_only_when_rate_limited(headers, expected):
+	policy = RetryPolicy()
+	assert policy.is_rate_limited(403, headers) is expected
+	assert policy.is_retryable(403, headers) is expected
+
+
+@pytest.mark.parametrize("status, expected", [(404, False), (429, True), (503, True)])
+def test_retryable_statuses(status, expected):
+	assert RetryPolicy().is_retryable(status) is expected
+
+
+def test_retry_after_seconds():
+	assert RetryPolicy().get_delay(1, {"Retry-After": "7"}) == 7.0
+
+
+def test_retry_after_http_date():
+	delay = RetryPolicy().get_delay(1, {"Retry-After": formatdate(time.time() + 30, usegmt=True)})
+	assert 28 <= delay <= 30
+
+
+def test_waits_until_rate_limit_reset():
+	reset = int(time.time()) + 120
+	delay = RetryPolicy().get_delay(1, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+	assert 119 <= delay <= 121
+
+
+def test_wait_longer_than_max_wait_is_fatal():
+	policy = RetryPolicy(max_wait=60)
+	assert policy.get_delay(1, {"Retry-After": "61"}) is None
+	reset = str(int(time.time()) + 3600)
+	assert policy.get_delay(1, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}) is None
+
+
+def test_backoff_is_jittered_and_capped():
+	policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=5)
+	assert 2 <= policy.get_delay(3) <= 4
+	assert 2.5 <= policy.get_delay(10) <= 5
+
+
+def test_circuit_breaker_opens_and_probes_after_cooldown(monkeypatch):
+	now = [1000.0]
+	monkeypatch.setattr("utils.retry_policy.time.monotonic", lambda: now[0])
+	breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+	host = CircuitBreaker.host_of("https://GitHub.com/owner/repo")
+
+	for _ in range(2):
+		breaker.record_failure(host)
+	assert breaker.allow(host)
+	breaker.record_failure(host)
+	assert not breaker.allow(host)
+	assert breaker.allow("api.github.com")
+
+	now[0] += 30
+	# Only one probe gets through; the next caller waits for another cooldown.
+	assert breaker.allow(host)
+	assert not breaker.allow(host)
+
+	breaker.record_success(host)
+	assert breaker.allow(host)
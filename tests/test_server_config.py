@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from app.server_config import ServerConfig
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "server_config")
+
+PROFILES = {
+	"small": {"cpu_count": 2, "total_memory_gb": 3.8, "heap_gb": 2},
+	"medium": {"cpu_count": 4, "total_memory_gb": 7.7, "heap_gb": 4},
+	"large": {"cpu_count": 16, "total_memory_gb": 31.2, "heap_gb": 16}
+}
+
+CASES = {
+	"small": ("small", {}),
+	"medium": ("medium", {}),
+	"large": ("large", {}),
+	"medium-100-players": ("medium", {"server_config": {"expected_players": 100}}),
+	"medium-overrides": ("medium", {"server_config": {"overrides": {
+		"server.properties": {"motd": "Lumi: survival", "view-distance": 12},
+		"nukkit.yml": {
+			"settings": {"language": "rus"},
+			"network": {"compression-level": 9},
+			"aliases": {}
+		}
+	}}})
+}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+@pytest.mark.parametrize("name", ["server.properties", "nukkit.yml"])
+def test_render_matches_golden(case, name):
+	profile_name, installer_config = CASES[case]
+	rendered = ServerConfig.render(PROFILES[profile_name], installer_config)[name]
+
+	path = os.path.join(GOLDEN_DIR, case, name)
+	# UPDATE_GOLDEN=1 rewrites the expected files after an intentional change; review the diff before committing.
+	if os.environ.get("UPDATE_GOLDEN"):
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(path, "w", encoding="utf-8", newline="\n") as f:
+			f.write(rendered)
+	with open(path, "r", encoding="utf-8") as f:
+		assert rendered == f.read()
+
+
+def test_render_yaml_empty_dict_and_strings():
+	rendered = ServerConfig.render_yaml({
+		"aliases": {},
+		"settings": {"language": "rus", "motd": "Lumi: #1", "shutdown-message": 'say "bye"', "enabled": True},
+		"worlds": ["world", "nether"],
+		"seed": None
+	})
+
+	assert rendered == (
+		"aliases: {}\n"
+		"settings:\n"
+		"  language: \"rus\"\n"
+		"  motd: \"Lumi: #1\"\n"
+		"  shutdown-message: \"say \\\"bye\\\"\"\n"
+		"  enabled: true\n"
+		"worlds: [\"world\", \"nether\"]\n"
+		"seed: null\n"
+	)
+	assert "\n\n" not in rendered
@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import signal
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="stub java is a POSIX script")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_FILES = os.path.join(REPO_DIR, "resources", "server_files")
+
+# Stands in for `java -jar Lumi.jar`: records its arguments, then either crashes or behaves like a server.
+STUB_JAVA = f"""#!{sys.executable}
+import json, os, sys
+here = os.getcwd()
+with open(os.path.join(here, "argv.json"), "w") as f:
+	json.dump(sys.argv[1:], f)
+if os.environ.get("STUB_MODE") == "crash":
+	print("Exception in thread main", flush=True)
+	sys.exit(1)
+print("Loading...", flush=True)
+print("Done (0.5s)! For help, type help", flush=True)
+line = sys.stdin.readline()
+with open(os.path.join(here, "stdin.txt"), "w") as f:
+	f.write(line)
+sys.exit(0)
+"""
+
+
+@pytest.fixture
+def server_dir(tmp_path):
+	shutil.copy(os.path.join(SERVER_FILES, "supervisor.py"), tmp_path / "supervisor.py")
+	java = tmp_path / "java" / "bin" / "java"
+	java.parent.mkdir(parents=True)
+	java.write_text(STUB_JAVA)
+	java.chmod(java.stat().st_mode | stat.S_IEXEC)
+	return tmp_path
+
+
+def write_config(server_dir, **values):
+	config = {
+		"memory_gb": 2, "core_name": "Lumi.jar", "jvm_args": ["-XX:+UseG1GC"],
+		"backoff_initial": 0.1, "backoff_multiplier": 2, "backoff_max": 1,
+		"crash_loop_max": 3, "crash_loop_window": 60, "rss_interval": 0.2
+	}
+	config.update(values)
+	(server_dir / "supervisor.json").write_text(json.dumps(config))
+
+
+def read_metrics(server_dir):
+	path = server_dir / "logs" / "supervisor.jsonl"
+	if not path.exists():
+		return []
+	return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_crash_loop_backs_off_and_stops(server_dir):
+	write_config(server_dir)
+	result = subprocess.run(
+		[sys.executable, str(server_dir / "supervisor.py")], cwd=server_dir, stdin=subprocess.DEVNULL,
+		capture_output=True, env=dict(os.environ, STUB_MODE="crash"), timeout=30
+	)
+
+	assert result.returncode == 2
+	events = read_metrics(server_dir)
+	assert [e["event"] for e in events if e["event"] in ("exit", "crash_loop")] == ["exit", "exit", "exit", "crash_loop"]
+	assert [e["delay"] for e in events if e["event"] == "restart"] == [0.1, 0.2]
+	assert all(e["exit_code"] == 1 and e["time_to_ready"] is None for e in events if e["event"] == "exit")
+
+
+def test_command_built_from_supervisor_json(server_dir):
+	write_config(server_dir, crash_loop_max=1)
+	subprocess.run(
+		[sys.executable, str(server_dir / "supervisor.py")], cwd=server_dir, stdin=subprocess.DEVNULL,
+		capture_output=True, env=dict(os.environ, STUB_MODE="crash"), timeout=30
+	)
+
+	argv = json.loads((server_dir / "argv.json").read_text())
+	assert argv == ["-Xmx2G", "-Xms2G", "-XX:+UseG1GC", "-jar", str(server_dir / "Lumi.jar"), "nogui"]
+
+
+def test_start_script_uses_supervisor_json(server_dir):
+	with open(os.path.join(SERVER_FILES, "start.sh"), "r", encoding="utf-8") as f:
+		script = f.read().replace("{MEMORY}", "7").replace("{CORE_NAME}", "Lumi.jar")
+	(server_dir / "start.sh").write_text(script)
+	write_config(server_dir, memory_gb=3, crash_loop_max=1)
+
+	result = subprocess.run(
+		["bash", str(server_dir / "start.sh")], cwd=server_dir, stdin=subprocess.DEVNULL,
+		capture_output=True, env=dict(os.environ, STUB_MODE="crash"), timeout=30
+	)
+
+	assert result.returncode == 2
+	assert json.loads((server_dir / "argv.json").read_text())[:2] == ["-Xmx3G", "-Xms3G"]
+
+
+def test_sigterm_stops_server_gracefully(server_dir):
+	write_config(server_dir)
+	process = subprocess.Popen(
+		[sys.executable, str(server_dir / "supervisor.py")], cwd=server_dir, stdin=subprocess.PIPE,
+		stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+	)
+	try:
+		deadline = time.monotonic() + 20
+		while not any(e["event"] == "ready" for e in read_metrics(server_dir)):
+			assert time.monotonic() < deadline, "server never reported ready"
+			time.sleep(0.05)
+		process.send_signal(signal.SIGTERM)
+		assert process.wait(20) == 0
+	finally:
+		if process.poll() is None:
+			process.kill()
+
+	assert (server_dir / "stdin.txt").read_text() == "stop\n"
+	events = read_metrics(server_dir)
+	ready = next(e for e in events if e["event"] == "ready")
+	assert ready["time_to_ready"] >= 0
+	exit_event = next(e for e in events if e["event"] == "exit")
+	assert exit_event["exit_code"] == 0 and exit_event["stopping"] is True
+	assert not any(e["event"] == "restart" for e in events)
@@ -0,0 +1,180 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import zipfile
+from typing import Dict, List, Optional
+
+from utils.file_utils import FileUtils
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+DIGEST_NAME = "manifest.sha256"
+SIGNATURE_NAME = "manifest.sig"
+BUNDLE_KEY_ENV = "LUMI_BUNDLE_KEY"
+
+
+class BundleError(Exception):
+	pass
+
+
+def _get_key(key: Optional[str]) -> Optional[bytes]:
+	key = key if key is not None else os.environ.get(BUNDLE_KEY_ENV)
+	return key.encode("utf-8") if key else None
+
+
+class BundleWriter:
+	def __init__(self, output_path: str, key: Optional[str] = None):
+		self.output_path = output_path
+		self.key = _get_key(key)
+		self.files: Dict[str, Dict] = {}
+		self.release: Optional[Dict] = None
+		self.java: Dict[str, Dict[str, str]] = {}
+		self._sources: Dict[str, str] = {}
+
+	def add_file(self, source_path: str, arcname: str, url: Optional[str] = None):
+		self._sources[arcname] = source_path
+		self.files[arcname] = {
+			"size": os.path.getsize(source_path),
+			"sha256": FileUtils.calculate_sha256(source_path, 1024 * 1024),
+			"url": url
+		}
+
+	def add_core(self, source_path: str, download_info: Dict):
+		arcname = f"core/{download_info['asset_name']}"
+		self.add_file(source_path, arcname, download_info.get("download_url"))
+		self.release = {
+			"version": download_info.get("version"),
+			"asset_name": download_info["asset_name"],
+			"path": arcname
+		}
+
+	def add_java(self, source_path: str, platform_key: str, version: str, url: str):
+		arcname = f"java/{os.path.basename(source_path)}"
+		self.add_file(source_path, arcname, url)
+		self.java.setdefault(platform_key, {})[version] = arcname
+
+	def write(self) -> Dict:
+		manifest = {
+			"format": BUNDLE_FORMAT,
+			"created": int(time.time()),
+			"release": self.release,
+			"java": self.java,
+			"files": self.files
+		}
+		manifest_bytes = json.dumps(manifest, indent="\t", sort_keys=True).encode("utf-8")
+
+		tmp_path = self.output_path + ".part"
+		# The payload is already compressed (jar, tar.gz, msi), so store it as-is.
+		with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+			zf.writestr(MANIFEST_NAME, manifest_bytes)
+			zf.writestr(DIGEST_NAME, hashlib.sha256(manifest_bytes).hexdigest())
+			if self.key:
+				zf.writestr(SIGNATURE_NAME, hmac.new(self.key, manifest_bytes, hashlib.sha256).hexdigest())
+			for arcname, source_path in self._sources.items():
+				zf.write(source_path, arcname)
+
+		os.replace(tmp_path, self.output_path)
+		logging.info(f"Бандл записан: {self.output_path} ({len(self.files)} файлов)")
+		return manifest
+
+
+class OfflineBundle:
+	def __init__(self, bundle_path: str, key: Optional[str] = None):
+		self.bundle_path = bundle_path
+		self.key = _get_key(key)
+		self.manifest: Dict = {}
+
+	def _read_manifest(self, zf: zipfile.ZipFile) -> Dict:
+		names = set(zf.namelist())
+		if MANIFEST_NAME not in names or DIGEST_NAME not in names:
+			raise BundleError("В бандле отсутствует манифест.")
+
+		manifest_bytes = zf.read(MANIFEST_NAME)
+		expected_digest = zf.read(DIGEST_NAME).decode("ascii").strip()
+		if hashlib.sha256(manifest_bytes).hexdigest() != expected_digest:
+			raise BundleError("Контрольная сумма манифеста не совпадает.")
+
+		if self.key:
+			if SIGNATURE_NAME not in names:
+				raise BundleError("Бандл не подписан, а ключ проверки задан.")
+			signature = zf.read(SIGNATURE_NAME).decode("ascii").strip()
+			expected = hmac.new(self.key, manifest_bytes, hashlib.sha256).hexdigest()
+			if not hmac.compare_digest(signature, expected):
+				raise BundleError("Подпись манифеста недействительна.")
+		elif SIGNATURE_NAME in names:
+			logging.warning(f"Бандл подписан, но ключ {BUNDLE_KEY_ENV} не задан: подпись не проверена.")
+
+		manifest = json.loads(manifest_bytes.decode("utf-8"))
+		if manifest.get("format") != BUNDLE_FORMAT:
+			raise BundleError(f"Неподдерживаемый формат бандла: {manifest.get('format')}")
+		return manifest
+
+	def _check_member(self, zf: zipfile.ZipFile, arcname: str, entry: Dict):
+		sha256 = hashlib.sha256()
+		size = 0
+		with zf.open(arcname) as f:
+			for chunk in iter(lambda: f.read(1024 * 1024), b""):
+				sha256.update(chunk)
+				size += len(chunk)
+		if size != entry["size"] or sha256.hexdigest() != entry["sha256"]:
+			raise BundleError(f"Файл {arcname} в бандле повреждён.")
+
+	def open(self) -> "OfflineBundle":
+		try:
+			with zipfile.ZipFile(self.bundle_path, "r") as zf:
+				self.manifest = self._read_manifest(zf)
+		except (zipfile.BadZipFile, FileNotFoundError, KeyError, ValueError) as e:
+			raise BundleError(f"Не удалось открыть бандл: {e}")
+		return self
+
+	def verify(self, arcnames: Optional[List[str]] = None):
+		files = self.manifest.get("files", {})
+		with zipfile.ZipFile(self.bundle_path, "r") as zf:
+			for arcname in arcnames if arcnames is not None else files:
+				if arcname not in files:
+					raise BundleError(f"Файл {arcname} не описан в манифесте.")
+				try:
+					self._check_member(zf, arcname, files[arcname])
+				except KeyError:
+					raise BundleError(f"Файл {arcname} отсутствует в бандле.")
+
+	def get_release(self) -> Optional[Dict]:
+		return self.manifest.get("release")
+
+	def get_java_path(self, platform_key: str, version: str) -> Optional[str]:
+		return self.manifest.get("java", {}).get(platform_key, {}).get(version)
+
+	def get_java_versions(self, platform_key: str) -> List[str]:
+		return sorted(self.manifest.get("java", {}).get(platform_key, {}))
+
+	def extract(self, arcname: str, destination: str) -> str:
+		entry = self.manifest.get("files", {}).get(arcname)
+		if entry is None:
+			raise BundleError(f"Файл {arcname} не описан в манифесте.")
+
+		os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+		tmp_path = destination + ".part"
+		sha256 = hashlib.sha256()
+		with zipfile.ZipFile(self.bundle_path, "r") as zf:
+			with zf.open(arcname) as src, open(tmp_path, "wb") as dst:
+				for chunk in iter(lambda: src.read(1024 * 1024), b""):
+					sha256.update(chunk)
+					dst.write(chunk)
+
+		if sha256.hexdigest() != entry["sha256"]:
+			os.remove(tmp_path)
+			raise BundleError(f"Файл {arcname} в бандле повреждён.")
+
+		os.replace(tmp_path, destination)
+		return destination
+
+	def extract_cached(self, arcname: str, cache_dir: str) -> str:
+		destination = os.path.join(cache_dir, os.path.basename(arcname))
+		entry = self.manifest.get("files", {}).get(arcname)
+		if entry and os.path.isfile(destination) and os.path.getsize(destination) == entry["size"] \
+				and FileUtils.calculate_sha256(destination, 1024 * 1024) == entry["sha256"]:
+			return destination
+		return self.extract(arcname, destination)
@@ -0,0 +1,236 @@
+import logging
+import os
+import re
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from utils.file_utils import FileUtils
+
+DEFAULT_PORT = 8765
+DISCOVERY_PORT = 8766
+DISCOVERY_REQUEST = b"LUMI-CACHE?"
+DISCOVERY_REPLY_PREFIX = b"LUMI-CACHE "
+DIGEST_HEADER = "X-Content-SHA256"
+FILES_PREFIX = "/files/"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def mirror_url(mirror: str, url: str) -> str:
+	name = os.path.basename(url.split("?", 1)[0])
+	return f"{mirror.rstrip('/')}{FILES_PREFIX}{name}"
+
+
+class _DigestCache:
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._digests: Dict[str, Tuple[int, float, str]] = {}
+
+	def get(self, path: str) -> str:
+		st = os.stat(path)
+		with self._lock:
+			cached = self._digests.get(path)
+		if cached and cached[0] == st.st_size and cached[1] == st.st_mtime:
+			return cached[2]
+
+		digest = FileUtils.calculate_sha256(path, 1024 * 1024)
+		with self._lock:
+			self._digests[path] = (st.st_size, st.st_mtime, digest)
+		return digest
+
+
+class _CacheRequestHandler(BaseHTTPRequestHandler):
+	server_version = "LumiCache/1.0"
+
+	def log_message(self, format, *args):
+		logging.info(f"[cache] {self.address_string()} {format % args}")
+
+	def _resolve(self) -> Optional[str]:
+		if not self.path.startswith(FILES_PREFIX):
+			return None
+		name = unquote(self.path[len(FILES_PREFIX):].split("?", 1)[0])
+		if not name or name != os.path.basename(name) or name.startswith(".") or name.endswith(".part"):
+			return None
+		path = os.path.join(self.server.cache_dir, name)
+		return path if os.path.isfile(path) else None
+
+	def _parse_range(self, size: int) -> Optional[Tuple[int, int]]:
+		header = self.headers.get("Range")
+		if not header:
+			return None
+		match = _RANGE_RE.match(header.strip())
+		if not match or match.group(1) == match.group(2) == "":
+			raise ValueError(header)
+		if match.group(1) == "":
+			start = max(0, size - int(match.group(2)))
+			end = size - 1
+		else:
+			start = int(match.group(1))
+			end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+		if start >= size or start > end:
+			raise ValueError(header)
+		return start, end
+
+	def _send_head(self) -> Optional[Tuple[str, int, int]]:
+		path = self._resolve()
+		if path is None:
+			self.send_error(404)
+			return None
+
+		size = os.path.getsize(path)
+		try:
+			byte_range = self._parse_range(size)
+		except ValueError:
+			self.send_response(416)
+			self.send_header("Content-Range", f"bytes */{size}")
+			self.send_header("Content-Length", "0")
+			self.end_headers()
+			return None
+
+		start, end = byte_range if byte_range else (0, size - 1)
+		self.send_response(206 if byte_range else 200)
+		self.send_header("Content-Type", "application/octet-stream")
+		self.send_header("Accept-Ranges", "bytes")
+		self.send_header("Content-Length", str(end - start + 1))
+		self.send_header(DIGEST_HEADER, self.server.digests.get(path))
+		if byte_range:
+			self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+		self.end_headers()
+		return path, start, end
+
+	def do_HEAD(self):
+		self._send_head()
+
+	def do_GET(self):
+		head = self._send_head()
+		if head is None:
+			return
+
+		path, start, end = head
+		remaining = end - start + 1
+		try:
+			with open(path, "rb") as f:
+				f.seek(start)
+				while remaining > 0:
+					chunk = f.read(min(1024 * 1024, remaining))
+					if not chunk:
+						break
+					self.wfile.write(chunk)
+					remaining -= len(chunk)
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+
+class CacheServer:
+	def __init__(self, cache_dir: str, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+				 discovery_port: Optional[int] = DISCOVERY_PORT):
+		self.cache_dir = cache_dir
+		self.host = host
+		self.port = port
+		self.discovery_port = discovery_port
+		self._httpd: Optional[ThreadingHTTPServer] = None
+		self._discovery_socket: Optional[socket.socket] = None
+		self._threads: List[threading.Thread] = []
+
+	@property
+	def url(self) -> str:
+		host = self.host if self.host not in ("0.0.0.0", "") else socket.gethostbyname(socket.gethostname())
+		return f"http://{host}:{self.port}"
+
+	def start(self) -> "CacheServer":
+		self._httpd = ThreadingHTTPServer((self.host, self.port), _CacheRequestHandler)
+		self._httpd.daemon_threads = True
+		self._httpd.cache_dir = self.cache_dir
+		self._httpd.digests = _DigestCache()
+		self.port = self._httpd.server_address[1]
+		self._spawn(self._httpd.serve_forever)
+
+		if self.discovery_port is not None:
+			self._discovery_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+			self._discovery_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+			self._discovery_socket.bind(("", self.discovery_port))
+			self._spawn(self._answer_discovery)
+
+		logging.info(f"Кэш-сервер запущен на порту {self.port}, каталог {self.cache_dir}")
+		return self
+
+	def _spawn(self, target):
+		thread = threading.Thread(target=target, daemon=True)
+		thread.start()
+		self._threads.append(thread)
+
+	def _answer_discovery(self):
+		sock = self._discovery_socket
+		while True:
+			try:
+				data, address = sock.recvfrom(64)
+			except OSError:
+				return
+			if data.strip() == DISCOVERY_REQUEST:
+				# The client sees our address as the packet source, so only the port is reported.
+				sock.sendto(DISCOVERY_REPLY_PREFIX + str(self.port).encode("ascii"), address)
+
+	def stop(self):
+		if self._httpd:
+			self._httpd.shutdown()
+			self._httpd.server_close()
+		if self._discovery_socket:
+			self._discovery_socket.close()
+
+	def serve_forever(self):
+		self.start()
+		try:
+			for thread in self._threads:
+				thread.join()
+		except KeyboardInterrupt:
+			pass
+		finally:
+			self.stop()
+
+
+def discover_mirrors(port: int = DISCOVERY_PORT, timeout: float = 0.5) -> List[str]:
+	mirrors = []
+	sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+	try:
+		sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+		sock.settimeout(timeout)
+		for target in ("<broadcast>", "127.0.0.1"):
+			try:
+				sock.sendto(DISCOVERY_REQUEST, (target, port))
+			except OSError:
+				continue
+
+		while True:
+			try:
+				data, address = sock.recvfrom(64)
+			except socket.timeout:
+				break
+			if data.startswith(DISCOVERY_REPLY_PREFIX):
+				mirror = f"http://{address[0]}:{int(data[len(DISCOVERY_REPLY_PREFIX):])}"
+				if mirror not in mirrors:
+					mirrors.append(mirror)
+	except (OSError, ValueError) as e:
+		logging.warning(f"Поиск кэш-серверов в сети не удался: {e}")
+	finally:
+		sock.close()
+	return mirrors
+
+
+def resolve_mirrors(config: dict, explicit: Optional[List[str]] = None) -> List[str]:
+	mirrors = list(explicit or [])
+	env_mirror = os.environ.get("LUMI_CACHE_MIRROR")
+	if env_mirror:
+		mirrors.append(env_mirror)
+	mirrors.extend(config.get("cache_mirrors", []))
+	if config.get("cache_discovery", False):
+		mirrors.extend(discover_mirrors())
+
+	unique = []
+	for mirror in mirrors:
+		mirror = mirror.rstrip("/")
+		if mirror and mirror not in unique:
+			unique.append(mirror)
+	return unique
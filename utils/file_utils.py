@@ -9,6 +9,18 @@ from pathlib import Path
 from typing import List
 
 class FileUtils:
+	@staticmethod
+	def get_app_dir() -> str:
+		path = os.path.join(os.path.expanduser("~"), ".lumi-installer")
+		os.makedirs(path, exist_ok=True)
+		return path
+
+	@staticmethod
+	def get_download_dir() -> str:
+		path = os.path.join(FileUtils.get_app_dir(), "downloads")
+		os.makedirs(path, exist_ok=True)
+		return path
+
 	@staticmethod
 	def create_directory(path: str, exist_ok: bool = True) -> bool:
 		try:
@@ -71,9 +83,9 @@ class FileUtils:
 			return False
 
 	@staticmethod
-	def calculate_sha256(filepath: str) -> str:
+	def calculate_sha256(filepath: str, chunk_size: int = 8192) -> str:
 		sha256 = hashlib.sha256()
 		with open(filepath, "rb") as f:
-			for chunk in iter(lambda: f.read(8192), b""):
+			for chunk in iter(lambda: f.read(chunk_size), b""):
 				sha256.update(chunk)
 		return sha256.hexdigest()
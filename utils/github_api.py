@@ -1,20 +1,98 @@
+import fnmatch
+import time
 import requests
 import logging
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.retry_policy import CircuitBreaker, RetryPolicy, get_circuit_breaker
+
+DEFAULT_ASSET_PATTERN = "Lumi*.jar"
 
 class GitHubAPI:
-	def __init__(self, repo_owner: str, repo_name: str):
+	def __init__(self, repo_owner: str, repo_name: str, asset_pattern: str = DEFAULT_ASSET_PATTERN,
+				 token: Optional[str] = None, retry_policy: Optional[RetryPolicy] = None,
+				 on_retry: Optional[Callable[[Dict], None]] = None):
 		self.repo_owner = repo_owner
 		self.repo_name = repo_name
+		self.asset_pattern = asset_pattern
 		self.base_url = "https://api.github.com"
+		self.token = token
+		self.retry_policy = retry_policy or RetryPolicy()
+		self.breaker: CircuitBreaker = get_circuit_breaker()
+		self.on_retry = on_retry
+
+	def _report_retry(self, attempt: int, wait: float, reason: str):
+		logging.warning(f"GitHub API: {reason}, повтор через {wait:.1f} с (попытка {attempt})",
+						extra={"phase": "github_api", "attempt": attempt})
+		if self.on_retry:
+			self.on_retry({"type": "retry", "attempt": attempt, "wait": round(wait, 1), "reason": reason})
+
+	def _get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
+		headers = dict(headers or {})
+		headers.setdefault("Accept", "application/vnd.github+json")
+		if self.token:
+			headers["Authorization"] = f"Bearer {self.token}"
+
+		host = CircuitBreaker.host_of(url)
+		policy = self.retry_policy
+		for attempt in range(1, policy.max_attempts + 1):
+			if not self.breaker.allow(host):
+				raise requests.ConnectionError(f"{host} временно недоступен (слишком много ошибок подряд)")
+
+			try:
+				response = requests.get(url, params=params, headers=headers, timeout=10)
+			except (requests.ConnectionError, requests.Timeout) as e:
+				self.breaker.record_failure(host)
+				wait = policy.get_delay(attempt)
+				if attempt == policy.max_attempts:
+					raise
+				self._report_retry(attempt, wait, f"ошибка соединения: {e}")
+				time.sleep(wait)
+				continue
+
+			if response.status_code < 400:
+				self.breaker.record_success(host)
+				return response
+
+			if not policy.is_retryable(response.status_code, response.headers) or attempt == policy.max_attempts:
+				response.raise_for_status()
+			if response.status_code >= 500:
+				self.breaker.record_failure(host)
+
+			wait = policy.get_delay(attempt, response.headers)
+			if wait is None:
+				response.raise_for_status()
+			self._report_retry(attempt, wait, f"HTTP {response.status_code}")
+			time.sleep(wait)
+
+		raise requests.RequestException(f"Не удалось выполнить запрос за {policy.max_attempts} попыток")
+
+	def match_asset(self, assets: List[Dict]) -> Optional[Dict]:
+		for asset in assets:
+			if fnmatch.fnmatchcase(asset["name"], self.asset_pattern):
+				return asset
+		return None
+
+	def get_releases_page(self, page: int = 1, per_page: int = 100,
+						  etag: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+		url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}/releases"
+		headers = {"If-None-Match": etag} if etag else {}
+
+		try:
+			response = self._get(url, params={"page": page, "per_page": per_page}, headers=headers)
+			if response.status_code == 304:
+				return None, etag
+			return response.json(), response.headers.get("ETag")
+
+		except requests.RequestException as e:
+			logging.error(f"Ошибка получения списка релизов: {e}")
+			raise
 
 	def get_latest_release(self) -> Optional[Dict]:
 		url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}/releases/latest"
 
 		try:
-			response = requests.get(url, timeout=10)
-			response.raise_for_status()
-			return response.json()
+			return self._get(url).json()
 
 		except requests.RequestException as e:
 			logging.error(f"Ошибка получения данных о релизе: {e}")
@@ -26,28 +104,19 @@ class GitHubAPI:
 		if not release_data:
 			return None
 
-		assets = release_data.get("assets", [])
-
-		if not assets:
-			return None
-
-		for asset in assets:
-			if asset["name"].endswith(".jar") and asset["name"].startswith("Lumi"):
-				return asset["browser_download_url"]
-
-		return None
+		asset = self.match_asset(release_data.get("assets", []))
+		return asset["browser_download_url"] if asset else None
 
 	def get_download_info(self) -> Optional[Dict]:
 		release_data = self.get_latest_release()
 		if not release_data:
 			return None
 
-		assets = release_data.get("assets", [])
-		for asset in assets:
-			if asset["name"].endswith(".jar") and asset["name"].startswith("Lumi"):
-				return {
-					"version": release_data.get("tag_name"),
-					"asset_name": asset["name"],
-					"download_url": asset["browser_download_url"]
-				}
-		return None
\ No newline at end of file
+		asset = self.match_asset(release_data.get("assets", []))
+		if not asset:
+			return None
+		return {
+			"version": release_data.get("tag_name"),
+			"asset_name": asset["name"],
+			"download_url": asset["browser_download_url"]
+		}
\ No newline at end of file
@@ -0,0 +1,65 @@
+import ctypes
+import os
+import platform
+from typing import Dict, Optional
+
+
+class HardwareUtils:
+	@staticmethod
+	def get_cpu_count() -> int:
+		if hasattr(os, "sched_getaffinity"):
+			try:
+				return max(1, len(os.sched_getaffinity(0)))
+			except OSError:
+				pass
+		return os.cpu_count() or 1
+
+	@staticmethod
+	def get_total_memory_bytes() -> Optional[int]:
+		if platform.system() == "Windows":
+			class MEMORYSTATUSEX(ctypes.Structure):
+				_fields_ = [
+					("dwLength", ctypes.c_ulong),
+					("dwMemoryLoad", ctypes.c_ulong),
+					("ullTotalPhys", ctypes.c_ulonglong),
+					("ullAvailPhys", ctypes.c_ulonglong),
+					("ullTotalPageFile", ctypes.c_ulonglong),
+					("ullAvailPageFile", ctypes.c_ulonglong),
+					("ullTotalVirtual", ctypes.c_ulonglong),
+					("ullAvailVirtual", ctypes.c_ulonglong),
+					("ullAvailExtendedVirtual", ctypes.c_ulonglong)
+				]
+
+			status = MEMORYSTATUSEX()
+			status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+			if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+				return status.ullTotalPhys
+			return None
+
+		try:
+			with open("/proc/meminfo", "r") as f:
+				for line in f:
+					if line.startswith("MemTotal:"):
+						return int(line.split()[1]) * 1024
+		except (OSError, ValueError, IndexError):
+			pass
+
+		try:
+			return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+		except (AttributeError, ValueError, OSError):
+			return None
+
+	@staticmethod
+	def recommended_heap_gb(total_memory_gb: float) -> int:
+		# Leave room for the OS and JVM off-heap memory; past 16 GB a bigger heap only lengthens GC pauses.
+		return max(1, min(16, int(total_memory_gb * 0.6)))
+
+	@staticmethod
+	def detect() -> Dict:
+		total_bytes = HardwareUtils.get_total_memory_bytes()
+		total_gb = round(total_bytes / (1024 ** 3), 1) if total_bytes else 8.0
+		return {
+			"cpu_count": HardwareUtils.get_cpu_count(),
+			"total_memory_gb": total_gb,
+			"heap_gb": HardwareUtils.recommended_heap_gb(total_gb)
+		}
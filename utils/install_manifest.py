@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from utils.file_utils import FileUtils
+
+MANIFEST_NAME = ".lumi-install.json"
+MANIFEST_FORMAT = 1
+
+
+def _hash_file(path: str) -> Dict:
+	sha256 = FileUtils.calculate_sha256(path, 1024 * 1024)
+	st = os.stat(path)
+	return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+
+
+def _default_jobs() -> int:
+	return min(16, (os.cpu_count() or 1) * 2)
+
+
+class InstallManifest:
+	def __init__(self, install_path: str):
+		self.install_path = install_path
+		self.path = os.path.join(install_path, MANIFEST_NAME)
+		self.data = self._load()
+
+	def _load(self) -> Dict:
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				data = json.load(f)
+			if data.get("format") == MANIFEST_FORMAT:
+				return data
+		except (FileNotFoundError, json.JSONDecodeError):
+			pass
+		return {"format": MANIFEST_FORMAT, "components": {}, "files": {}}
+
+	def exists(self) -> bool:
+		return os.path.exists(self.path)
+
+	def save(self):
+		self.data["updated"] = int(time.time())
+		tmp_path = self.path + ".part"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self.data, f, ensure_ascii=False, indent="\t", sort_keys=True)
+		os.replace(tmp_path, self.path)
+
+	@property
+	def components(self) -> Dict[str, Dict]:
+		return self.data["components"]
+
+	@property
+	def files(self) -> Dict[str, Dict]:
+		return self.data["files"]
+
+	def _relpath(self, path: str) -> str:
+		return os.path.relpath(path, self.install_path).replace(os.sep, "/")
+
+	def _abspath(self, relpath: str) -> str:
+		return os.path.join(self.install_path, *relpath.split("/"))
+
+	@staticmethod
+	def walk(directory: str) -> List[str]:
+		paths = []
+		for dirpath, dirnames, filenames in os.walk(directory):
+			for filename in filenames:
+				path = os.path.join(dirpath, filename)
+				if not os.path.islink(path):
+					paths.append(path)
+		return paths
+
+	def record(self, component: str, paths: Iterable[str], source: Optional[Dict] = None, jobs: Optional[int] = None):
+		for relpath in [r for r, entry in self.files.items() if entry["component"] == component]:
+			del self.files[relpath]
+
+		paths = list(paths)
+		with ThreadPoolExecutor(max_workers=jobs or _default_jobs()) as executor:
+			for path, entry in zip(paths, executor.map(_hash_file, paths)):
+				entry["component"] = component
+				self.files[self._relpath(path)] = entry
+
+		self.components[component] = {"source": source or {}, "recorded": int(time.time())}
+		self.save()
+
+	def _check(self, relpath: str, full: bool) -> Optional[str]:
+		entry = self.files[relpath]
+		path = self._abspath(relpath)
+		try:
+			st = os.stat(path)
+		except FileNotFoundError:
+			return "missing"
+		if st.st_size != entry["size"]:
+			return "size"
+		if not full and st.st_mtime_ns == entry["mtime_ns"]:
+			return None
+		if _hash_file(path)["sha256"] != entry["sha256"]:
+			return "digest"
+		return None
+
+	def is_editable(self, relpath: str) -> bool:
+		component = self.components.get(self.files[relpath]["component"], {})
+		return bool(component.get("source", {}).get("editable"))
+
+	def verify(self, full: bool = False, jobs: Optional[int] = None) -> Dict[str, str]:
+		relpaths = list(self.files)
+		with ThreadPoolExecutor(max_workers=jobs or _default_jobs()) as executor:
+			results = executor.map(lambda relpath: self._check(relpath, full), relpaths)
+			problems = {relpath: problem for relpath, problem in zip(relpaths, results) if problem}
+		# Files the user is expected to edit are only reported as modified; a missing one is still damage.
+		for relpath, problem in problems.items():
+			if problem != "missing" and self.is_editable(relpath):
+				problems[relpath] = "modified"
+		return problems
+
+	def confirm(self, relpaths: Iterable[str]) -> List[str]:
+		still_damaged = []
+		for relpath in relpaths:
+			entry = self.files[relpath]
+			path = self._abspath(relpath)
+			current = _hash_file(path) if os.path.exists(path) else None
+			if current is None or current["sha256"] != entry["sha256"]:
+				still_damaged.append(relpath)
+			else:
+				entry["mtime_ns"] = current["mtime_ns"]
+		self.save()
+		return still_damaged
+
+	def accept(self, relpaths: Iterable[str]):
+		for relpath in relpaths:
+			entry = _hash_file(self._abspath(relpath))
+			entry["component"] = self.files[relpath]["component"]
+			self.files[relpath] = entry
+		self.save()
+
+	def damaged_components(self, damaged: Dict[str, str]) -> Dict[str, List[str]]:
+		by_component: Dict[str, List[str]] = {}
+		for relpath in damaged:
+			by_component.setdefault(self.files[relpath]["component"], []).append(relpath)
+		return by_component
@@ -97,6 +97,34 @@ class JavaUtils:
 
 		return None
 
+	@staticmethod
+	def get_arch_key() -> Optional[str]:
+		arch = platform.machine().lower()
+		if arch in ("x86_64", "amd64"):
+			return "x64"
+		if arch in ("aarch64", "arm64"):
+			return "aarch64"
+		return None
+
+	@staticmethod
+	def get_platform_key() -> Optional[str]:
+		system = platform.system()
+		if system == "Windows":
+			return "windows"
+		if system == "Linux":
+			arch_key = JavaUtils.get_arch_key()
+			return f"linux-{arch_key}" if arch_key else None
+		return None
+
+	@staticmethod
+	def get_java_url(java_urls: dict, platform_key: str, version: str) -> Optional[str]:
+		if platform_key == "windows":
+			return java_urls.get("windows", {}).get(version)
+		if platform_key.startswith("linux-"):
+			arch_key = platform_key.split("-", 1)[1]
+			return java_urls.get("linux", {}).get(version, {}).get(arch_key)
+		return None
+
 	@staticmethod
 	def is_version_supported(major_version: int, required: int = 21) -> bool:
 		return major_version >= required
@@ -0,0 +1,96 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import platform
+import queue
+import sys
+from typing import Optional
+
+LOG_FIELDS = ("phase", "task", "bytes", "total", "url", "path", "attempt")
+MAX_LOG_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+	def format(self, record: logging.LogRecord) -> str:
+		entry = {
+			"ts": round(record.created, 3),
+			"level": record.levelname,
+			"logger": record.name,
+			"thread": record.threadName,
+			"msg": record.getMessage()
+		}
+		for field in LOG_FIELDS:
+			value = getattr(record, field, None)
+			if value is not None:
+				entry[field] = value
+		if record.exc_info:
+			entry["exc"] = self.formatException(record.exc_info)
+		return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogUtils:
+	_listener: Optional[logging.handlers.QueueListener] = None
+
+	@staticmethod
+	def get_log_dir() -> str:
+		if platform.system() == "Windows":
+			base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+			path = os.path.join(base, "LumiInstaller", "logs")
+		else:
+			base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+			path = os.path.join(base, "lumi-installer", "logs")
+		os.makedirs(path, exist_ok=True)
+		return path
+
+	@staticmethod
+	def setup_logging(level: Optional[str] = None, log_dir: Optional[str] = None) -> str:
+		if LogUtils._listener is not None:
+			return log_dir or LogUtils.get_log_dir()
+
+		level = getattr(logging, (level or os.environ.get("LUMI_LOG_LEVEL", "INFO")).upper(), logging.INFO)
+		log_dir = log_dir or LogUtils.get_log_dir()
+
+		json_handler = logging.handlers.RotatingFileHandler(
+			os.path.join(log_dir, "installer.jsonl"), maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT,
+			encoding="utf-8", delay=True
+		)
+		json_handler.setFormatter(JsonFormatter())
+
+		text_handler = logging.handlers.RotatingFileHandler(
+			os.path.join(log_dir, "installer.log"), maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT,
+			encoding="utf-8", delay=True
+		)
+		text_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+		handlers = [json_handler, text_handler]
+		# The windowed build has no console at all.
+		if sys.stderr is not None:
+			console_handler = logging.StreamHandler(sys.stderr)
+			console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+			console_handler.setLevel(max(level, logging.WARNING))
+			handlers.append(console_handler)
+
+		# Callers (Tk thread, download loop) only enqueue records; file I/O happens on the listener thread.
+		log_queue = queue.SimpleQueue()
+		root = logging.getLogger()
+		for handler in list(root.handlers):
+			root.removeHandler(handler)
+		root.addHandler(logging.handlers.QueueHandler(log_queue))
+		root.setLevel(level)
+
+		LogUtils._listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+		LogUtils._listener.start()
+		atexit.register(LogUtils.shutdown)
+		return log_dir
+
+	@staticmethod
+	def shutdown():
+		if LogUtils._listener is not None:
+			LogUtils._listener.stop()
+			for handler in LogUtils._listener.handlers:
+				handler.close()
+			LogUtils._listener = None
@@ -0,0 +1,224 @@
+import fnmatch
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from utils.github_api import DEFAULT_ASSET_PATTERN, GitHubAPI
+from utils.retry_policy import RetryPolicy, get_github_token
+
+INDEX_FORMAT = 1
+PAGE_SIZE = 100
+
+# Only a "-suffix" marks a pre-release; "+build" metadata does not change precedence.
+_VERSION_RE = re.compile(r"(\d+(?:\.\d+)*)(?:-([0-9A-Za-z.\-]+))?(?:\+[0-9A-Za-z.\-]+)?")
+_OPERATOR_SPACE_RE = re.compile(r"(>=|<=|==|!=|>|<|=|\^|~)\s+")
+_COMPARATOR_RE = re.compile(r"^(>=|<=|==|!=|>|<|=|\^|~)?v?(\d+(?:\.\d+)*)(\.\*)?$")
+
+
+class CatalogError(Exception):
+	pass
+
+
+def parse_version(tag: str) -> Optional[Tuple[Tuple[int, ...], bool]]:
+	match = _VERSION_RE.search(tag or "")
+	if not match:
+		return None
+	numbers = tuple(int(part) for part in match.group(1).split("."))
+	return numbers, bool(match.group(2))
+
+
+def _asset_sha256(asset: Dict) -> Optional[str]:
+	digest = asset.get("digest") or ""
+	return digest[len("sha256:"):] if digest.startswith("sha256:") else None
+
+
+def _pad(numbers: Tuple[int, ...], length: int = 3) -> Tuple[int, ...]:
+	return numbers + (0,) * (length - len(numbers)) if len(numbers) < length else numbers
+
+
+def _bump(numbers: Tuple[int, ...], index: int) -> Tuple[int, ...]:
+	return numbers[:index] + (numbers[index] + 1,)
+
+
+def _range_bounds(spec: str) -> List[Tuple[str, Tuple[int, ...]]]:
+	bounds = []
+	# ">= 1.2" is glued into ">=1.2" first, so whitespace can still separate comparators (">=1.2 <2").
+	for part in re.split(r"[,\s]+", _OPERATOR_SPACE_RE.sub(r"\1", spec.strip())):
+		if not part:
+			continue
+		match = _COMPARATOR_RE.match(part)
+		if not match:
+			raise CatalogError(f"Некорректный спецификатор версии: {part}")
+
+		op, numbers, wildcard = match.group(1) or "==", tuple(int(n) for n in match.group(2).split(".")), match.group(3)
+		if wildcard or op in ("^", "~"):
+			if op == "^":
+				index = next((i for i, n in enumerate(numbers) if n != 0), len(numbers) - 1)
+			elif op == "~":
+				index = min(1, len(numbers) - 1) if len(numbers) > 1 else 0
+			else:
+				index = len(numbers) - 1
+			bounds += [(">=", numbers), ("<", _bump(numbers, index))]
+		else:
+			bounds.append(("==" if op == "=" else op, numbers))
+	return bounds
+
+
+def _satisfies(numbers: Tuple[int, ...], bounds: List[Tuple[str, Tuple[int, ...]]]) -> bool:
+	for op, target in bounds:
+		length = max(len(numbers), len(target), 3)
+		left, right = _pad(numbers, length), _pad(target, length)
+		if not {
+			">=": left >= right, "<=": left <= right, ">": left > right,
+			"<": left < right, "==": left == right, "!=": left != right
+		}[op]:
+			return False
+	return True
+
+
+class ReleaseCatalog:
+	def __init__(self, github_api: GitHubAPI, index_path: str):
+		self.github_api = github_api
+		self.index_path = index_path
+		self.index = self._load()
+
+	@classmethod
+	def from_config(cls, config: Dict, data_dir: str, on_retry=None, repo: Optional[str] = None,
+					asset_pattern: Optional[str] = None) -> "ReleaseCatalog":
+		repo_owner, repo_name = (repo or config["github_repo"]).split("/")
+		github_api = GitHubAPI(
+			repo_owner, repo_name, asset_pattern or config.get("core_asset_pattern", DEFAULT_ASSET_PATTERN),
+			token=get_github_token(config), retry_policy=RetryPolicy.from_config(config), on_retry=on_retry
+		)
+		return cls(github_api, os.path.join(data_dir, f"releases-{repo_owner}-{repo_name}.json"))
+
+	def _load(self) -> Dict:
+		try:
+			with open(self.index_path, "r", encoding="utf-8") as f:
+				index = json.load(f)
+			if index.get("format") == INDEX_FORMAT and index.get("repo") == self._repo():
+				return index
+		except (FileNotFoundError, json.JSONDecodeError):
+			pass
+		return {"format": INDEX_FORMAT, "repo": self._repo(), "updated": 0, "etag": None, "releases": []}
+
+	def _save(self):
+		os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+		tmp_path = self.index_path + ".part"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self.index, f, ensure_ascii=False, separators=(",", ":"))
+		os.replace(tmp_path, self.index_path)
+
+	def _repo(self) -> str:
+		return f"{self.github_api.repo_owner}/{self.github_api.repo_name}"
+
+	@staticmethod
+	def _compact(release: Dict) -> Dict:
+		return {
+			"id": release["id"],
+			"tag": release.get("tag_name"),
+			"date": release.get("published_at") or release.get("created_at"),
+			"prerelease": bool(release.get("prerelease")),
+			"assets": [
+				{
+					"name": asset["name"],
+					"size": asset.get("size"),
+					"url": asset["browser_download_url"],
+					"sha256": _asset_sha256(asset)
+				}
+				for asset in release.get("assets", [])
+			]
+		}
+
+	@property
+	def releases(self) -> List[Dict]:
+		return self.index["releases"]
+
+	def update(self) -> int:
+		known_ids = {release["id"] for release in self.releases}
+		fetched: List[Dict] = []
+		changed = False
+		complete = False
+		page = 1
+
+		try:
+			while True:
+				# Only the first page is conditional: a 304 means nothing changed since the last update.
+				releases, etag = self.github_api.get_releases_page(
+					page, PAGE_SIZE, etag=self.index.get("etag") if page == 1 and self.releases else None
+				)
+				if releases is None:
+					break
+				changed = True
+				if page == 1:
+					self.index["etag"] = etag
+
+				# Known releases are refreshed too: assets are often uploaded after the release is created.
+				fetched += [self._compact(release) for release in releases if not release.get("draft")]
+				if len(releases) < PAGE_SIZE:
+					complete = True
+					break
+				if any(release["id"] in known_ids for release in fetched):
+					break
+				page += 1
+		except requests.RequestException as e:
+			if not self.releases:
+				raise CatalogError(f"Не удалось получить список релизов: {e}")
+			logging.warning(f"Каталог релизов не обновлён, используется локальный индекс: {e}")
+			return 0
+
+		fresh_count = len({release["id"] for release in fetched} - known_ids)
+		if changed:
+			self.index["releases"] = self._merge(fetched, complete)
+		self.index["updated"] = int(time.time())
+		self._save()
+		logging.info(f"Каталог релизов {self._repo()}: новых релизов {fresh_count}, всего {len(self.releases)}")
+		return fresh_count
+
+	def _merge(self, fetched: List[Dict], complete: bool) -> List[Dict]:
+		if complete:
+			return fetched
+		fetched_ids = {release["id"] for release in fetched}
+		# The fetched pages cover everything down to the last known release they contain, so any known
+		# release above that point that is missing from them was deleted upstream.
+		last_seen = max(index for index, release in enumerate(self.releases) if release["id"] in fetched_ids)
+		return fetched + [release for release in self.releases[last_seen + 1:] if release["id"] not in fetched_ids]
+
+	def _candidates(self, spec: str) -> List[Dict]:
+		spec = (spec or "latest").strip()
+		if spec == "latest":
+			return [r for r in self.releases if not r["prerelease"]]
+		if spec == "latest-prerelease":
+			return list(self.releases)
+
+		for release in self.releases:
+			if release["tag"] and release["tag"].lstrip("v") == spec.lstrip("v"):
+				return [release]
+
+		bounds = _range_bounds(spec)
+		matched = []
+		for release in self.releases:
+			parsed = parse_version(release["tag"])
+			if parsed and not release["prerelease"] and not parsed[1] and _satisfies(parsed[0], bounds):
+				matched.append((parsed[0], release))
+		matched.sort(key=lambda item: item[0], reverse=True)
+		return [release for _, release in matched]
+
+	def resolve(self, spec: str = "latest", asset_pattern: Optional[str] = None) -> Optional[Dict]:
+		pattern = asset_pattern or self.github_api.asset_pattern
+		for release in self._candidates(spec):
+			for asset in release["assets"]:
+				if fnmatch.fnmatchcase(asset["name"], pattern):
+					return {
+						"version": release["tag"],
+						"asset_name": asset["name"],
+						"download_url": asset["url"],
+						"size": asset["size"],
+						"sha256": asset["sha256"]
+					}
+		return None
@@ -0,0 +1,112 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def _header(headers, name: str) -> Optional[str]:
+	if headers is None:
+		return None
+	return headers.get(name)
+
+
+class RetryPolicy:
+	def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+				 multiplier: float = 2.0, max_wait: float = 900.0):
+		self.max_attempts = max_attempts
+		self.base_delay = base_delay
+		self.max_delay = max_delay
+		self.multiplier = multiplier
+		self.max_wait = max_wait
+
+	@classmethod
+	def from_config(cls, config: dict) -> "RetryPolicy":
+		return cls(**config.get("retry", {}))
+
+	@staticmethod
+	def is_rate_limited(status: int, headers=None) -> bool:
+		if status == 429:
+			return True
+		return status == 403 and (
+			_header(headers, "X-RateLimit-Remaining") == "0" or _header(headers, "Retry-After") is not None
+		)
+
+	def is_retryable(self, status: int, headers=None) -> bool:
+		return status in RETRYABLE_STATUSES or self.is_rate_limited(status, headers)
+
+	@staticmethod
+	def server_wait(headers) -> Optional[float]:
+		retry_after = _header(headers, "Retry-After")
+		if retry_after:
+			try:
+				return max(0.0, float(retry_after))
+			except ValueError:
+				try:
+					return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+				except (TypeError, ValueError):
+					pass
+
+		if _header(headers, "X-RateLimit-Remaining") == "0":
+			reset = _header(headers, "X-RateLimit-Reset")
+			if reset and reset.isdigit():
+				return max(0.0, int(reset) - time.time() + 1)
+		return None
+
+	def get_delay(self, attempt: int, headers=None) -> Optional[float]:
+		wait = self.server_wait(headers)
+		if wait is not None:
+			# A server-mandated wait longer than max_wait is treated as fatal rather than hanging the installer.
+			return wait if wait <= self.max_wait else None
+		backoff = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+		return random.uniform(backoff / 2, backoff)
+
+
+class CircuitBreaker:
+	def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+		self.failure_threshold = failure_threshold
+		self.cooldown = cooldown
+		self._lock = threading.Lock()
+		self._failures: Dict[str, int] = {}
+		self._opened_at: Dict[str, float] = {}
+
+	@staticmethod
+	def host_of(url: str) -> str:
+		return urlsplit(url).netloc.lower()
+
+	def allow(self, host: str) -> bool:
+		with self._lock:
+			opened_at = self._opened_at.get(host)
+			if opened_at is None:
+				return True
+			# Half-open: after the cooldown one request is let through to probe the host.
+			if time.monotonic() - opened_at >= self.cooldown:
+				self._opened_at[host] = time.monotonic()
+				return True
+			return False
+
+	def record_success(self, host: str):
+		with self._lock:
+			self._failures.pop(host, None)
+			self._opened_at.pop(host, None)
+
+	def record_failure(self, host: str):
+		with self._lock:
+			self._failures[host] = self._failures.get(host, 0) + 1
+			if self._failures[host] >= self.failure_threshold:
+				self._opened_at[host] = time.monotonic()
+
+
+_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+	return _breaker
+
+
+def get_github_token(config: Optional[dict] = None) -> Optional[str]:
+	return os.environ.get("GITHUB_TOKEN") or (config or {}).get("github_token") or None